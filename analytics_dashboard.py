@@ -0,0 +1,88 @@
+"""
+Utilization dashboard over recorded jobs (see plan_analytics.record_job).
+Run with: streamlit run analytics_dashboard.py
+"""
+import streamlit as st
+import pandas as pd
+
+from plan_analytics import (
+    DEFAULT_DIR, load_history, compact_history, engine_summary, waste_by_part_size, waste_by_wardrobe
+)
+
+@st.cache_data(ttl=60, show_spinner="Loading job history…")
+def cached_history(root):
+    return load_history(root)
+
+def waste_heatmap(table):
+    """
+    Mean waste per (length bin, width bin) as a matplotlib figure.
+    """
+    from matplotlib.figure import Figure
+    hm = table.pivot_table(index="width_bin", columns="length_bin", values="mean_waste")
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    im = ax.imshow(hm.values, cmap="magma_r", aspect="auto", origin="lower", vmin=0, vmax=1)
+    ax.set_xticks(range(len(hm.columns)), [str(int(c)) for c in hm.columns], rotation=90, fontsize=7)
+    ax.set_yticks(range(len(hm.index)), [str(int(i)) for i in hm.index], fontsize=7)
+    ax.set_xlabel("Part length bin (mm)")
+    ax.set_ylabel("Part width bin (mm)")
+    ax.set_title("Mean sheet waste by part size")
+    fig.colorbar(im, ax=ax)
+    return fig
+
+def main():
+    st.set_page_config(page_title="SpaceCraft Utilization", layout="wide")
+    st.title("📈 Utilization Analytics")
+
+    with st.sidebar:
+        root = st.text_input("History Folder", DEFAULT_DIR)
+        bin_mm = st.number_input("Part Size Bin (mm)", min_value=10, value=100, step=10)
+        if st.button("🗜 Compact History", use_container_width=True):
+            compact_history(root)
+            cached_history.clear()
+
+    sheets_df, parts_df = cached_history(root)
+    if sheets_df.empty:
+        st.info("No jobs recorded yet. Generate plans in the cut sheet apps first.")
+        return
+
+    engines = sorted(sheets_df["engine"].unique())
+    chosen = st.sidebar.multiselect("Engines", engines, default=engines)
+    sheets_df = sheets_df[sheets_df["engine"].isin(chosen)]
+    parts_df = parts_df[parts_df["engine"].isin(chosen)]
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Jobs", f"{sheets_df['job_id'].nunique():,}")
+    c2.metric("Sheets", f"{len(sheets_df):,}")
+    c3.metric("Mean Utilization", f"{sheets_df['utilization'].mean():.1%}")
+    waste_m2 = (sheets_df["sheet_area"] - sheets_df["used_area"]).clip(lower=0).sum() / 1e6
+    c4.metric("Total Waste", f"{waste_m2:,.1f} m²")
+
+    st.subheader("🔷 Efficiency per Engine")
+    st.dataframe(engine_summary(sheets_df), use_container_width=True)
+
+    st.subheader("🔷 Utilization Distribution")
+    bins = pd.cut(sheets_df["utilization"].clip(upper=1.0), bins=[i / 10 for i in range(11)], include_lowest=True)
+    st.bar_chart(bins.value_counts().sort_index().rename(lambda b: f"{b.left:.0%}–{b.right:.0%}"))
+
+    st.subheader("🔷 Waste by Part Size")
+    by_size = waste_by_part_size(parts_df, bin_mm)
+    st.pyplot(waste_heatmap(by_size))
+    st.dataframe(by_size.sort_values(["mean_waste", "parts"], ascending=False).head(25),
+                 use_container_width=True, hide_index=True)
+
+    by_type = waste_by_wardrobe(parts_df)
+    if not by_type.empty:
+        st.subheader("🔷 Waste by Wardrobe Type")
+        st.dataframe(by_type, use_container_width=True)
+
+    st.subheader("🔷 Largest Remnants")
+    st.dataframe(
+        sheets_df.nlargest(25, "remnant_area")[
+            ["job_id", "engine", "material", "sheet", "utilization", "remnant_length", "remnant_width"]
+        ],
+        use_container_width=True, hide_index=True
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,472 @@
+"""
+Sheet packing core shared by the Streamlit apps.
+No Streamlit calls here so the packer can run in worker processes and scripts.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import random
+
+DEFAULT_MATERIAL = "18mm"
+DEFAULT_SEED = 42
+
+# ============================ Legacy Greedy Core ============================
+def try_pack_in_single_sheet(sheet_W, sheet_H, existing_rects, candidate_rect, algo=None, miss_cache=None):
+    """
+    existing_rects: list of (w, h, rid) already placed in this sheet
+    candidate_rect: (w, h, rid) to test
+    algo: rectpack algorithm class, MaxRectsBssf by default
+    miss_cache: optional dict of known misses, owned by one fit (see greedy_fit_pieces)
+    Returns: (fits: bool, packed_rects: list of dicts if fits else None)
+    """
+    # rectpack is only imported once something is actually packed
+    from rectpack import newPacker, MaxRectsBssf
+    if algo is None:
+        algo = MaxRectsBssf
+    # rectpack is deterministic in the (w,h) sequence, so a known miss stays a miss
+    if miss_cache is not None:
+        miss_key = (sheet_W, sheet_H, algo, tuple((w, h) for (w, h, _) in existing_rects),
+                    candidate_rect[:2])
+        if miss_key in miss_cache:
+            return False, None
+
+    packer = newPacker(rotation=False, pack_algo=algo)
+    packer.add_bin(sheet_W, sheet_H)
+    for (w, h, rid) in existing_rects + [candidate_rect]:
+        packer.add_rect(w, h, rid=rid)
+    packer.pack()
+    bins = list(packer)
+    if not bins or len(bins[0]) != len(existing_rects) + 1:
+        if miss_cache is not None:
+            miss_cache[miss_key] = True
+        return False, None
+    b0 = bins[0]
+
+    rects = []
+    for r in b0:
+        rects.append({
+            "length":   r.width,   # rectpack stores (w,h); we draw length along X
+            "width":    r.height,  # and width along Y
+            "x_offset": r.x,
+            "y_offset": r.y,
+            "original_idx": r.rid
+        })
+    return True, rects
+
+def place_piece(material_length, material_width, sheets, sheet_rects, L, W, rid,
+                allow_rotation=True, open_new=True, miss_cache=None):
+    """
+    Place one piece into the first sheet it fits (both orientations if allowed),
+    opening a new sheet if needed and open_new is set. Updates sheets/sheet_rects in place.
+    miss_cache is passed on to try_pack_in_single_sheet.
+    Returns: index of the sheet used, or None if it was not placed.
+    """
+    orientations = [(L, W)]
+    if allow_rotation and (L != W):
+        orientations.append((W, L))
+
+    # Try to place into existing sheets
+    sheet_area = material_length * material_width
+    for s_i, existing in enumerate(sheet_rects):
+        # Not enough free area left: no need to ask rectpack
+        if sheet_area - sum(w * h for (w, h, _) in existing) < L * W:
+            continue
+        for (candW, candH) in orientations:
+            fits, rects = try_pack_in_single_sheet(
+                material_length, material_width,
+                existing_rects=existing,
+                candidate_rect=(candW, candH, rid),
+                miss_cache=miss_cache
+            )
+            if fits:
+                sheet_rects[s_i] = existing + [(candW, candH, rid)]
+                sheets[s_i]["cuts"] = rects
+                return s_i
+
+    if not open_new:
+        return None
+
+    # Open a new sheet (first orientation that fits)
+    for (candW, candH) in orientations:
+        fits, rects = try_pack_in_single_sheet(
+            material_length, material_width,
+            existing_rects=[],
+            candidate_rect=(candW, candH, rid)
+        )
+        if fits:
+            sheets.append({"cuts": rects})
+            sheet_rects.append([(candW, candH, rid)])
+            return len(sheets) - 1
+
+    # Piece larger than sheet: still place for visibility
+    sheets.append({"cuts": [{
+        "length": L, "width": W, "x_offset": 0, "y_offset": 0, "original_idx": rid
+    }]})
+    sheet_rects.append([(L, W, rid)])
+    return len(sheets) - 1
+
+def canonical_piece(p, allow_rotation=True):
+    """
+    (L, W) as packed first: integer sizes, long side first when rotation is allowed.
+    """
+    L, W = int(p['length']), int(p['width'])
+    if allow_rotation and W > L:
+        L, W = W, L
+    return L, W
+
+def packing_order_key(p, allow_rotation=True):
+    """
+    Sort key for the packing order: area desc, then longer side, then size and material.
+    Pieces that compare equal are interchangeable, so the result no longer depends on
+    how the input rows were ordered.
+    """
+    L, W = canonical_piece(p, allow_rotation)
+    return (-L * W, -max(L, W), -L, -W, str(p.get('material') or ''))
+
+def normalize_pieces(pieces, allow_rotation=True):
+    """
+    Canonical packing order. Returns: [(idx, L, W), ...]
+    """
+    order = sorted(range(len(pieces)), key=lambda i: packing_order_key(pieces[i], allow_rotation))
+    return [(i,) + canonical_piece(pieces[i], allow_rotation) for i in order]
+
+def greedy_fit_pieces(material_length, material_width, pieces, allow_rotation=True):
+    """
+    1) Sort by area desc (canonical order, see normalize_pieces)
+    2) For each piece, try to fit in each existing sheet (both orientations if allowed)
+    3) If not, open a new sheet
+    Returns: sheets = [{'cuts': [ {length,width,x_offset,y_offset,original_idx}, ... ]}, ...]
+    """
+    sheets = []
+    sheet_rects = []  # [(w,h,rid), ...]
+    miss_cache = {}   # known rectpack misses, for this fit only
+
+    for (rid, L, W) in normalize_pieces(pieces, allow_rotation):
+        place_piece(material_length, material_width, sheets, sheet_rects, L, W, rid,
+                    allow_rotation=allow_rotation, miss_cache=miss_cache)
+
+    return sheets
+
+def assign_piece_ids_and_colors(sheets, pieces, seed=DEFAULT_SEED):
+    """
+    Stable ID/color for same TRUE size; DO NOT overwrite packed sizes.
+    IDs follow the sheet order; colors come from random.Random(seed), one per ID.
+    """
+    unique = {}
+    cid = 1
+    rng = random.Random(seed)
+    palette = []
+
+    for sheet in sheets:
+        for cut in sheet['cuts']:
+            op = pieces[cut['original_idx']]
+            key = (int(op['length']), int(op['width']))
+            if op.get('material'):
+                # Same size in a different board is a different part
+                key = key + (op['material'],)
+            if key not in unique:
+                palette.append((rng.random(), rng.random(), rng.random()))
+                unique[key] = {'id': cid, 'color': palette[cid-1]}
+                cid += 1
+            cut['piece_id'] = unique[key]['id']
+            cut['color'] = unique[key]['color']
+    return unique
+
+
+# ============================ Strip / Shelf Core ============================
+def strip_fit_pieces(material_length, material_width, pieces, allow_rotation=True, lookback=8):
+    """
+    Two-phase level packing for jobs where many parts share a dimension (e.g. carcass depth).
+    1) Turn each piece so its height (Y) is the more common of its two sides, group by
+       height and lay pieces end to end into strips, tallest group first; shorter pieces
+       may fill what is left of the last `lookback` strips.
+    2) Stack strips onto sheets, tallest first; each strip goes to the first of the
+       last `lookback` open sheets with enough height left, else a new sheet.
+    Near-linear and guillotine-friendly; no rectpack calls.
+    Returns: same sheets structure as greedy_fit_pieces.
+    """
+    counts = {}
+    for p in pieces:
+        for side in {int(p['length']), int(p['width'])}:
+            counts[side] = counts.get(side, 0) + 1
+
+    groups = {}      # height -> [(length, idx), ...]
+    oversized = []
+    for i, p in enumerate(pieces):
+        L, W = int(p['length']), int(p['width'])
+        options = [(L, W)]
+        if allow_rotation and L != W:
+            options.append((W, L))
+        options = [(x, h) for (x, h) in options if x <= material_length and h <= material_width]
+        if not options:
+            oversized.append((L, W, i))
+            continue
+        # Most shared height wins; on a tie the lower strip leaves more room above
+        x, h = max(options, key=lambda o: (counts[o[1]], -o[1]))
+        groups.setdefault(h, []).append((x, i))
+
+    # Phase 1: strips, tallest group first, pieces end to end. A piece may also fill the
+    # leftover length of one of the last few (taller) strips.
+    strips = []      # (height, [(x_offset, length, y_height, idx), ...])
+    used = []        # used length per strip
+    for h in sorted(groups, reverse=True):
+        for (x, i) in sorted(groups[h], key=lambda t: (-t[0], t[1])):
+            k = None
+            for j in range(max(0, len(strips) - lookback), len(strips)):
+                if used[j] + x <= material_length:
+                    k = j
+                    break
+            if k is None:
+                strips.append((h, []))
+                used.append(0)
+                k = len(strips) - 1
+            strips[k][1].append((used[k], x, h, i))
+            used[k] += x
+
+    # Phase 2: strips onto sheets
+    sheets = []
+    heights = []     # used height per sheet
+    for (h, row) in strips:
+        s_i = None
+        for j in range(max(0, len(sheets) - lookback), len(sheets)):
+            if heights[j] + h <= material_width:
+                s_i = j
+                break
+        if s_i is None:
+            sheets.append({"cuts": []})
+            heights.append(0)
+            s_i = len(sheets) - 1
+        y = heights[s_i]
+        for (x_off, x, ph, i) in row:
+            sheets[s_i]["cuts"].append({
+                "length": x, "width": ph, "x_offset": x_off, "y_offset": y, "original_idx": i
+            })
+        heights[s_i] += h
+
+    # Piece larger than sheet: still place for visibility
+    for (L, W, i) in oversized:
+        sheets.append({"cuts": [{"length": L, "width": W, "x_offset": 0, "y_offset": 0, "original_idx": i}]})
+
+    return sheets
+
+# Packing strategies selectable by name
+ENGINES = {
+    "greedy": greedy_fit_pieces,
+    "strip": strip_fit_pieces,
+}
+
+# ============================ Multi-Material ============================
+def partition_pieces(pieces, key="material"):
+    """
+    Group piece indices by their material tag (pieces without one go to DEFAULT_MATERIAL).
+    Returns: {material: [idx, ...]} in first-seen order.
+    """
+    groups = {}
+    for i, p in enumerate(pieces):
+        groups.setdefault(p.get(key) or DEFAULT_MATERIAL, []).append(i)
+    return groups
+
+def _pack_partition(job):
+    material, sheet_L, sheet_W, sub_pieces, allow_rotation, engine = job
+    return material, ENGINES[engine](sheet_L, sheet_W, sub_pieces, allow_rotation=allow_rotation)
+
+def pack_by_material(pieces, stock_sizes, default_size, allow_rotation=True, max_workers=None,
+                     seed=DEFAULT_SEED, engine="greedy"):
+    """
+    pieces: list[{'length', 'width', 'material'?}]
+    stock_sizes: {material: (sheet_length, sheet_width)}; missing materials use default_size
+    engine: key of ENGINES ("greedy" or "strip")
+    Each material is packed on its own stock, partitions run concurrently.
+    Returns: {
+      'sheets': [ {'cuts': [...], 'material', 'sheet_length', 'sheet_width'}, ... ],  # all materials
+      'sheet_counts': {material: n},
+      'seed': seed
+    }
+    Materials come out in name order. original_idx in every cut refers back to `pieces`.
+    """
+    groups = partition_pieces(pieces)
+    jobs = []
+    for material, idxs in sorted(groups.items()):
+        sheet_L, sheet_W = stock_sizes.get(material, default_size)
+        sub = [pieces[i] for i in idxs]
+        jobs.append((material, int(sheet_L), int(sheet_W), sub, allow_rotation, engine))
+
+    if len(jobs) > 1 and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as ex:
+            results = list(ex.map(_pack_partition, jobs))
+    else:
+        results = [_pack_partition(j) for j in jobs]
+
+    plan = {"sheets": [], "sheet_counts": {}, "seed": seed}
+    for (material, sheet_L, sheet_W, *_), (_, sheets) in zip(jobs, results):
+        idxs = groups[material]
+        for sheet in sheets:
+            for cut in sheet["cuts"]:
+                cut["original_idx"] = idxs[cut["original_idx"]]
+            sheet.update({"material": material, "sheet_length": sheet_L, "sheet_width": sheet_W})
+            plan["sheets"].append(sheet)
+        plan["sheet_counts"][material] = len(sheets)
+    return plan
+
+# ============================ Size-List Packing (memoized) ============================
+# Lives here rather than in the Streamlit script: Streamlit re-executes its main script
+# as a fresh module on every rerun, so a cache there would not survive.
+# (sizes, stock, default_size, allow_rotation, engine) -> {material: (sheets, cut_area)}
+_pack_cache = {}
+_PACK_CACHE_MAX = 50_000
+
+def _pack_sizes(job):
+    sizes, stock, default_size, allow_rotation, engine = job
+    pieces = [{"length": L, "width": W, "material": m} for (L, W, m) in sizes]
+    plan = pack_by_material(pieces, dict(stock), default_size, allow_rotation=allow_rotation,
+                            max_workers=1, engine=engine)
+    out = {}
+    for s in plan["sheets"]:
+        n, cut_area = out.get(s["material"], (0, 0))
+        out[s["material"]] = (n + 1, cut_area + sum(c["length"] * c["width"] for c in s["cuts"]))
+    return out
+
+def pack_many(size_keys, stock_sizes, default_size, allow_rotation=True, max_workers=None,
+              engine="greedy"):
+    """
+    Pack each distinct size list once (in parallel), each material on its own stock
+    as in pack_by_material.
+    size_keys: hashable size lists, e.g. sorted tuples of (L, W, material).
+    stock_sizes: {material: (sheet_length, sheet_width)}; missing materials use default_size
+    Returns: {sizes: {material: (sheets, cut_area)}}
+    Results are kept for the life of the process, so repeated sweeps only pack new part lists.
+    """
+    stock = tuple(sorted((m, (int(L), int(W))) for m, (L, W) in stock_sizes.items()))
+    default_size = (int(default_size[0]), int(default_size[1]))
+    jobs = {(k, stock, default_size, allow_rotation, engine) for k in size_keys}
+    todo = [j for j in jobs if j not in _pack_cache]
+    if len(_pack_cache) + len(todo) > _PACK_CACHE_MAX:
+        _pack_cache.clear()
+        todo = list(jobs)
+    if len(todo) > 1 and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as ex:
+            for job, res in zip(todo, ex.map(_pack_sizes, todo, chunksize=4)):
+                _pack_cache[job] = res
+    else:
+        for job in todo:
+            _pack_cache[job] = _pack_sizes(job)
+    return {j[0]: _pack_cache[j] for j in jobs}
+
+# ============================ Incremental Plan ============================
+def new_plan(stock_sizes, default_size, allow_rotation=True, seed=DEFAULT_SEED):
+    """
+    Empty plan that can be edited piece-group by piece-group ("owners", e.g. one wardrobe).
+    stock_sizes: {material: (sheet_length, sheet_width)}; missing materials use default_size
+    """
+    return {
+        "stock_sizes": dict(stock_sizes), "default_size": tuple(default_size),
+        "allow_rotation": allow_rotation,
+        "seed": seed,
+        "materials": {},   # material -> {'sheets': [...], 'sheet_rects': [...]}
+        "pieces": {},      # rid -> piece
+        "owners": {},      # owner -> [rid, ...]
+        "next_rid": 0,
+    }
+
+def _stock(plan, material):
+    return plan["stock_sizes"].get(material, plan["default_size"])
+
+def plan_add(plan, owner, pieces, miss_cache=None):
+    """
+    Add an owner's pieces into the existing sheets (area desc), opening sheets only when needed.
+    miss_cache: known rectpack misses to share across several adds (see plan_sync).
+    """
+    rids = []
+    for p in pieces:
+        rid = plan["next_rid"]
+        plan["next_rid"] += 1
+        plan["pieces"][rid] = p
+        rids.append(rid)
+    plan["owners"].setdefault(owner, []).extend(rids)
+
+    rotate = plan["allow_rotation"]
+    rids.sort(key=lambda r: packing_order_key(plan["pieces"][r], rotate))
+    if miss_cache is None:
+        miss_cache = {}
+    for rid in rids:
+        p = plan["pieces"][rid]
+        material = p.get("material") or DEFAULT_MATERIAL
+        sub = plan["materials"].setdefault(material, {"sheets": [], "sheet_rects": []})
+        sheet_L, sheet_W = _stock(plan, material)
+        before = len(sub["sheets"])
+        L, W = canonical_piece(p, rotate)
+        place_piece(sheet_L, sheet_W, sub["sheets"], sub["sheet_rects"], L, W, rid,
+                    allow_rotation=rotate, miss_cache=miss_cache)
+        if len(sub["sheets"]) > before:
+            sub["sheets"][-1].update({"material": material, "sheet_length": sheet_L, "sheet_width": sheet_W})
+
+def _dissolve_sheet(plan, sub, material, s_i):
+    """
+    Try to move every piece of sheet s_i into the other sheets of the same material.
+    Commits and drops the sheet only if all of them fit.
+    """
+    sheet_L, sheet_W = _stock(plan, material)
+    others = [i for i in range(len(sub["sheets"])) if i != s_i]
+    sheets = [{"cuts": list(sub["sheets"][i]["cuts"])} for i in others]
+    sheet_rects = [list(sub["sheet_rects"][i]) for i in others]
+    moving = sorted(sub["sheet_rects"][s_i], key=lambda r: r[0] * r[1], reverse=True)
+    miss_cache = {}
+    for (w, h, rid) in moving:
+        if place_piece(sheet_L, sheet_W, sheets, sheet_rects, w, h, rid,
+                       allow_rotation=plan["allow_rotation"], open_new=False,
+                       miss_cache=miss_cache) is None:
+            return False
+    for j, i in enumerate(others):
+        sub["sheets"][i]["cuts"] = sheets[j]["cuts"]
+        sub["sheet_rects"][i] = sheet_rects[j]
+    del sub["sheets"][s_i]
+    del sub["sheet_rects"][s_i]
+    return True
+
+def plan_remove(plan, owner):
+    """
+    Remove an owner's pieces. Other placements stay where they are; sheets that were
+    touched are emptied or, if their remaining pieces fit elsewhere, merged away.
+    """
+    rids = set(plan["owners"].pop(owner, []))
+    if not rids:
+        return
+    for material, sub in plan["materials"].items():
+        touched = []
+        for s_i, sheet in enumerate(sub["sheets"]):
+            keep = [c for c in sheet["cuts"] if c["original_idx"] not in rids]
+            if len(keep) != len(sheet["cuts"]):
+                sheet["cuts"] = keep
+                sub["sheet_rects"][s_i] = [r for r in sub["sheet_rects"][s_i] if r[2] not in rids]
+                touched.append(sheet)
+        # Drop emptied sheets, then try to merge the lightest touched sheets away
+        for s_i in reversed(range(len(sub["sheets"]))):
+            if not sub["sheets"][s_i]["cuts"]:
+                del sub["sheets"][s_i]
+                del sub["sheet_rects"][s_i]
+        touched = sorted((s for s in touched if s["cuts"]),
+                         key=lambda s: sum(c["length"] * c["width"] for c in s["cuts"]))
+        for sheet in touched:
+            s_i = next(i for i, s in enumerate(sub["sheets"]) if s is sheet)
+            _dissolve_sheet(plan, sub, material, s_i)
+    for rid in rids:
+        plan["pieces"].pop(rid, None)
+
+def plan_sync(plan, owned_pieces):
+    """
+    Bring the plan in line with owned_pieces = {owner: pieces}: owners no longer present
+    are removed, new owners are added, unchanged owners are left alone.
+    Returns: (added_owners, removed_owners)
+    """
+    removed = [o for o in plan["owners"] if o not in owned_pieces]
+    for o in removed:
+        plan_remove(plan, o)
+    added = [o for o in owned_pieces if o not in plan["owners"]]
+    miss_cache = {}   # dropped with this sync, nothing kept between calls
+    for o in added:
+        plan_add(plan, o, owned_pieces[o], miss_cache=miss_cache)
+    return added, removed
+
+def plan_sheets(plan):
+    """
+    All sheets of an incremental plan, grouped by material (in name order).
+    """
+    return [s for _, sub in sorted(plan["materials"].items()) for s in sub["sheets"]]
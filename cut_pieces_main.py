@@ -1,30 +1,99 @@
 import streamlit as st
-import wardrobe_type1
-import wardrobe_type2
-import wardrobe_type3
+from wardrobe_parts import TYPES, calc_lines, wardrobe_parts, expand_pieces, input_key
+from wardrobe_formulas import make_form
+from cut_engine import new_plan, plan_sync, plan_sheets, assign_piece_ids_and_colors
+from plan_export import export_bytes, sheet_label
 
 # --- Map wardrobe types to their form/calc functions and image paths ---
 type_fns = {
-    "2-Door Cupboard": (
-        wardrobe_type1.form_type1,
-        wardrobe_type1.calc_type1,
-        "2door.jpg"
-    ),
-    "3-Door Cupboard Type 1": (
-        wardrobe_type2.form_type2,
-        wardrobe_type2.calc_type2,
-        "3door.png"
-    ),
-    "3-Door Cupboard Type 2": (
-        wardrobe_type3.form_type3,
-        wardrobe_type3.calc_type3,
-        "3door_2.png"
-    ),
+    label: (make_form(spec), lambda data, label=label: calc_lines(label, data), spec["image"])
+    for label, spec in TYPES.items()
 }
 
+@st.cache_resource(show_spinner=False)
+def load_image(path):
+    """
+    Wardrobe picture bytes, read from disk once per server process.
+    """
+    with open(path, "rb") as f:
+        return f.read()
+
+@st.cache_data(show_spinner=False, max_entries=4096)
+def wardrobe_lines(tname, key):
+    """
+    Material lines for one wardrobe, cached on its type and input key.
+    """
+    return calc_lines(tname, dict(key))
+
 st.set_page_config(page_title="Wardrobe Multi-Type Material Calculator", layout="wide")
 st.title("🛠️ Multi-Type Wardrobe Calculator")
 
+# --- Combined cut plan helpers ---
+def wardrobe_owners():
+    """
+    One stable key per added wardrobe: (type, inputs, n) where n counts identical
+    earlier entries, so duplicates are separate owners and list order doesn't matter.
+    """
+    seen = {}
+    owners = []
+    for tname, data in zip(st.session_state["all_types_labels"], st.session_state["all_types_inputs"]):
+        k = (tname, input_key(data))
+        seen[k] = seen.get(k, 0) + 1
+        owners.append((tname, data, k + (seen[k],)))
+    return owners
+
+def plan_materials():
+    """
+    Materials used by the added wardrobes, in name order.
+    """
+    materials = set()
+    for tname, data, _ in wardrobe_owners():
+        try:
+            materials.update(p["material"] for p in wardrobe_parts(tname, data) if p.get("material"))
+        except Exception:
+            continue  # reported by sync_cut_plan
+    return sorted(materials)
+
+def sync_cut_plan(sheet_size, stock_sizes):
+    """
+    Repair the session's cut plan for the wardrobes that changed since the last rerun.
+    A new sheet size or stock table starts the plan over.
+    Returns: (plan, errors)
+    """
+    plan = st.session_state.get("cut_plan")
+    if plan is None or plan["default_size"] != sheet_size or plan["stock_sizes"] != stock_sizes:
+        plan = new_plan(stock_sizes, sheet_size)
+        st.session_state["cut_plan"] = plan
+    owned, errors = {}, []
+    for tname, data, owner in wardrobe_owners():
+        if owner in plan["owners"]:
+            owned[owner] = None  # unchanged, pieces not needed
+            continue
+        try:
+            owned[owner] = [dict(p, wardrobe=tname) for p in expand_pieces(wardrobe_parts(tname, data))]
+        except Exception as e:
+            errors.append(f"{tname}: {type(e).__name__}: {e}")
+    added, removed = plan_sync(plan, owned)
+    if added or removed:
+        st.session_state.pop("cut_plan_exports", None)
+    return plan, errors
+
+def is_oversized(sheet):
+    """
+    True for the sheet of a part larger than the stock (placed only for visibility).
+    """
+    return any(c["x_offset"] + c["length"] > sheet["sheet_length"]
+               or c["y_offset"] + c["width"] > sheet["sheet_width"] for c in sheet["cuts"])
+
+def plan_export(fmt, sheets, pieces, sheet_size):
+    """
+    Export bytes for the current plan, built once and kept until the plan changes.
+    """
+    exports = st.session_state.setdefault("cut_plan_exports", {})
+    if (fmt, sheet_size) not in exports:
+        exports[(fmt, sheet_size)] = export_bytes(fmt, sheets, pieces, *sheet_size)
+    return exports[(fmt, sheet_size)]
+
 # --- Session state init ---
 if "all_types_inputs" not in st.session_state:
     st.session_state["all_types_inputs"] = []
@@ -92,15 +161,75 @@ if st.session_state["all_types_inputs"]:
     st.header("📋 All Materials by Wardrobe Type")
     for i, tname in enumerate(st.session_state["all_types_labels"]):
         st.subheader(f"{tname} — Option {i+1}")
-        calc_fn = type_fns[tname][1]
         image_path = type_fns[tname][2]
         cols = st.columns([1, 2])
         with cols[0]:
-            st.image(image_path, caption=tname, use_container_width ='always')
+            st.image(load_image(image_path), caption=tname, use_container_width ='always')
         with cols[1]:
-            mats = calc_fn(st.session_state["all_types_inputs"][i])
+            mats = wardrobe_lines(tname, input_key(st.session_state["all_types_inputs"][i]))
             for line in mats:
                 st.write("- " + line)
         st.markdown("---")
+
+    # --- Combined cut plan (only changed wardrobes are re-placed) ---
+    st.header("🧾 Combined Cut Plan")
+    c1, c2 = st.columns(2)
+    sheet_L = c1.number_input("Sheet Length (mm)", min_value=1, value=2140, key="plan_sheet_L")
+    sheet_W = c2.number_input("Sheet Width (mm)", min_value=1, value=1200, key="plan_sheet_W")
+
+    # Stock size per material (defaults to the sheet size above); only sizes that
+    # differ from it are kept, so a new material doesn't start the plan over
+    stock_sizes = {}
+    with st.expander("🧱 Stock per Material"):
+        for material in plan_materials():
+            m1, m2 = st.columns(2)
+            L = m1.number_input(f"{material} Length (mm)", min_value=1, value=int(sheet_L),
+                                key=f"stock_L_{material}")
+            W = m2.number_input(f"{material} Width (mm)", min_value=1, value=int(sheet_W),
+                                key=f"stock_W_{material}")
+            if (int(L), int(W)) != (int(sheet_L), int(sheet_W)):
+                stock_sizes[material] = (int(L), int(W))
+
+    plan, errors = sync_cut_plan((int(sheet_L), int(sheet_W)), stock_sizes)
+    for err in errors:
+        st.error(f"Could not calculate parts for {err}")
+    sheets = plan_sheets(plan)
+    for material, sub in sorted(plan["materials"].items()):
+        if not sub["sheets"]:
+            continue
+        # Parts larger than the stock get a sheet of their own; warn instead of counting them
+        fitted = [s for s in sub["sheets"] if not is_oversized(s)]
+        for s in sub["sheets"]:
+            if is_oversized(s):
+                c = s["cuts"][0]
+                st.warning(f"{material}: {int(c['length'])}×{int(c['width'])} mm part is larger than the "
+                           f"{s['sheet_length']}×{s['sheet_width']} mm stock.")
+        used = sum(c["length"] * c["width"] for s in fitted for c in s["cuts"])
+        total = sum(s["sheet_length"] * s["sheet_width"] for s in fitted)
+        summary = f"{used / total:.0%} used" if total else "no part fits the stock"
+        with st.expander(f"{material}: {len(fitted)} sheets ({summary})"):
+            for i, sheet in enumerate(sub["sheets"], start=1):
+                if is_oversized(sheet):
+                    continue
+                st.write(f"**{sheet_label(sheet, i)}**")
+                for c in sheet["cuts"]:
+                    st.write(f"- {int(c['length'])}×{int(c['width'])} mm at "
+                             f"({int(c['x_offset'])}, {int(c['y_offset'])})")
+    st.write(f"**Total Sheets Used: {sum(not is_oversized(s) for s in sheets)}**")
+    if sheets:
+        assign_piece_ids_and_colors(sheets, plan["pieces"], seed=plan["seed"])
+        cols = st.columns(4)
+        for col, fmt in zip(cols, ["json", "csv", "dxf"]):
+            data, mime = plan_export(fmt, sheets, plan["pieces"], (int(sheet_L), int(sheet_W)))
+            col.download_button(f"📥 {fmt.upper()}", data=data, file_name=f"cut_plan.{fmt}", mime=mime,
+                                use_container_width=True)
+        if cols[3].button("📈 Record for Analytics", use_container_width=True):
+            try:
+                # pandas/pyarrow are only loaded when a plan is recorded
+                from plan_analytics import record_job
+                record_job(sheets, plan["pieces"], int(sheet_L), int(sheet_W), "greedy", source="cut_pieces_main")
+                st.toast("Plan recorded.")
+            except Exception as e:
+                st.warning(f"Plan not recorded for analytics ({type(e).__name__}: {e}).")
 else:
     st.info("No wardrobes added yet. Use the sidebar to add one.")
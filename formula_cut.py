@@ -1,12 +1,12 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-from matplotlib.backends.backend_pdf import PdfPages
-from matplotlib.ticker import MaxNLocator
-from rectpack import newPacker, MaxRectsBssf
 import io
-import random
+import sqlite3
+
+from cut_engine import pack_by_material, assign_piece_ids_and_colors, DEFAULT_MATERIAL
+from plan_export import export_bytes, sheet_numbers, sheet_label
+import plan_store
+from plan_analytics import record_job, sheet_metrics
 
 st.set_page_config(page_title="SpaceCraft Cut Sheet", page_icon="✂️", layout="wide")
 
@@ -19,6 +19,8 @@ with st.sidebar:
     material_width  = st.number_input("Material Width (mm)",  min_value=1, value=1200)
 
     allow_rotation =True
+    engine_label = st.selectbox("Packing Engine", ["Greedy (MaxRects)", "Strip / Shelf (fast, uniform jobs)"])
+    engine = "strip" if engine_label.startswith("Strip") else "greedy"
     #allow_rotation = st.toggle("Allow Piece Rotation (try both orientations)", value=True)
     #st.caption("This uses your legacy greedy per-sheet logic. No kerf applied (exact part sizes).")
 
@@ -30,16 +32,39 @@ with st.sidebar:
         example = pd.DataFrame({
             "Length (mm)": [1000, 2000, 1500, 860, 698, 917],
             "Width (mm)":  [300,  1200, 1100, 589, 175, 897],
-            "Quantity":    [1,    14,   10,   5,   10,  5]
+            "Quantity":    [1,    14,   10,   5,   10,  5],
+            "Material":    [DEFAULT_MATERIAL] * 6
         })
         pieces_df = st.data_editor(
             example, num_rows="dynamic", use_container_width=True, hide_index=True, key="pieces_table"
         )
     else:
-        up = st.file_uploader("Upload CSV (Length (mm), Width (mm), Quantity)", type=["csv"])
+        up = st.file_uploader("Upload CSV (Length (mm), Width (mm), Quantity[, Material])", type=["csv"])
         pieces_df = pd.read_csv(up) if up else pd.DataFrame({"Length (mm)": [], "Width (mm)": [], "Quantity": []})
+    if "Material" not in pieces_df.columns:
+        pieces_df["Material"] = DEFAULT_MATERIAL
+
+    # Stock size per material (defaults to the sheet size above)
+    materials = sorted({str(m).strip() or DEFAULT_MATERIAL for m in pieces_df["Material"].fillna(DEFAULT_MATERIAL)})
+    stock_sizes = {}
+    if len(materials) > 1:
+        st.markdown("## 🧱 Stock per Material")
+        stock_df = st.data_editor(
+            pd.DataFrame({
+                "Material": materials,
+                "Length (mm)": [material_length] * len(materials),
+                "Width (mm)": [material_width] * len(materials),
+            }),
+            disabled=["Material"], use_container_width=True, hide_index=True, key="stock_table"
+        )
+        for _, r in stock_df.iterrows():
+            try:
+                stock_sizes[r["Material"]] = (int(r["Length (mm)"]), int(r["Width (mm)"]))
+            except Exception:
+                continue
 
     st.markdown("---")
+    seed = st.number_input("Color Seed", min_value=0, value=42, step=1)
     dark_mode = st.toggle("🌒 Dark Mode UI", value=False)
     #show_instructions = st.checkbox("Show Instructions & Tips", value=True)
     show_instructions = False
@@ -66,124 +91,14 @@ if show_instructions:
 - **No kerf** applied; pieces are placed at **true sizes** (exact, no shrink).  
         """)
 
-# ============================ Legacy Greedy Core ============================
-def try_pack_in_single_sheet(sheet_W, sheet_H, existing_rects, candidate_rect, algo=MaxRectsBssf):
-    """
-    existing_rects: list of (w, h, rid) already placed in this sheet
-    candidate_rect: (w, h, rid) to test
-    Returns: (fits: bool, packed_rects: list of dicts if fits else None)
-    """
-    packer = newPacker(rotation=False, pack_algo=algo)
-    packer.add_bin(sheet_W, sheet_H)
-    for (w, h, rid) in existing_rects + [candidate_rect]:
-        packer.add_rect(w, h, rid=rid)
-    packer.pack()
-    bins = list(packer)
-    if not bins:
-        return False, None
-    b0 = bins[0]
-    if len(b0) != len(existing_rects) + 1:
-        return False, None
-
-    rects = []
-    for r in b0:
-        rects.append({
-            "length":   r.width,   # rectpack stores (w,h); we draw length along X
-            "width":    r.height,  # and width along Y
-            "x_offset": r.x,
-            "y_offset": r.y,
-            "original_idx": r.rid
-        })
-    return True, rects
-
-def greedy_fit_pieces(material_length, material_width, pieces, allow_rotation=True):
-    """
-    1) Sort by area desc
-    2) For each piece, try to fit in each existing sheet (both orientations if allowed)
-    3) If not, open a new sheet
-    Returns: sheets = [{'cuts': [ {length,width,x_offset,y_offset,original_idx}, ... ]}, ...]
-    """
-    sheets = []
-    sheet_rects = []  # [(w,h,rid), ...]
-
-    # Sort by area (desc)
-    pieces_sorted = sorted(
-        [{'length': p['length'], 'width': p['width'], 'idx': i}
-         for i, p in enumerate(pieces)],
-        key=lambda x: x['length'] * x['width'],
-        reverse=True
-    )
-
-    for p in pieces_sorted:
-        L, W, rid = int(p['length']), int(p['width']), int(p['idx'])
-
-        orientations = [(L, W)]
-        if allow_rotation and (L != W):
-            orientations.append((W, L))
-
-        placed = False
-
-        # Try to place into existing sheets
-        for s_i, existing in enumerate(sheet_rects):
-            for (candW, candH) in orientations:
-                fits, rects = try_pack_in_single_sheet(
-                    material_length, material_width,
-                    existing_rects=existing,
-                    candidate_rect=(candW, candH, rid)
-                )
-                if fits:
-                    sheet_rects[s_i] = existing + [(candW, candH, rid)]
-                    sheets[s_i] = {"cuts": rects}
-                    placed = True
-                    break
-            if placed:
-                break
-
-        # If not placed, open a new sheet (first orientation that fits)
-        if not placed:
-            chosen = None
-            for (candW, candH) in orientations:
-                fits, rects = try_pack_in_single_sheet(
-                    material_length, material_width,
-                    existing_rects=[],
-                    candidate_rect=(candW, candH, rid)
-                )
-                if fits:
-                    chosen = (candW, candH)
-                    sheets.append({"cuts": rects})
-                    sheet_rects.append([chosen + (rid,)])
-                    break
-            if not chosen:
-                # Piece larger than sheet: still place for visibility
-                sheets.append({"cuts": [{
-                    "length": L, "width": W, "x_offset": 0, "y_offset": 0, "original_idx": rid
-                }]})
-                sheet_rects.append([(L, W, rid)])
-
-    return sheets
-
-def assign_piece_ids_and_colors(sheets, pieces):
-    """
-    Stable ID/color for same TRUE size; DO NOT overwrite packed sizes.
-    """
-    unique = {}
-    cid = 1
-    rng = random.Random(42)
-    palette = [(rng.random(), rng.random(), rng.random()) for _ in range(2048)]
-
-    for sheet in sheets:
-        for cut in sheet['cuts']:
-            op = pieces[cut['original_idx']]
-            key = (int(op['length']), int(op['width']))
-            if key not in unique:
-                unique[key] = {'id': cid, 'color': palette[cid-1]}
-                cid += 1
-            cut['piece_id'] = unique[key]['id']
-            cut['color'] = unique[key]['color']
-    return unique
-
 # ============================ Plot / PDF ============================
+# matplotlib is imported inside these functions so reruns that don't draw skip it
 def draw_sheet(ax, sheet, mat_L, mat_W):
+    import matplotlib.patches as mpatches
+    from matplotlib.ticker import MaxNLocator
+    # Multi-material plans carry their own stock size
+    mat_L = sheet.get("sheet_length", mat_L)
+    mat_W = sheet.get("sheet_width", mat_W)
     for c in sheet["cuts"]:
         ax.add_patch(mpatches.Rectangle(
             (c["x_offset"], c["y_offset"]), c["length"], c["width"],
@@ -204,31 +119,53 @@ def draw_sheet(ax, sheet, mat_L, mat_W):
     ax.set_xlabel("Length (mm)")
     ax.set_ylabel("Width (mm)")
 
-def plot_tabs(material_length, material_width, sheets):
+def sheet_titles(sheets):
+    """
+    "18mm #1", "18mm #2", "6mm #1"...: numbered within each material, as in the exports.
+    """
+    return [sheet_label(sh, n) for sh, n in zip(sheets, sheet_numbers(sheets))]
+
+def plot_tabs(material_length, material_width, sheets, images=None):
     st.subheader("🔷 Cutting Plan Visualization")
-    tabs = st.tabs([f"Sheet {i+1}" for i in range(len(sheets))] or ["No sheets"])
+    titles = sheet_titles(sheets)
+    tabs = st.tabs(titles or ["No sheets"])
     for i, (t, sh) in enumerate(zip(tabs, sheets)):
         with t:
-            fig, ax = plt.subplots(figsize=(10, 7))
-            draw_sheet(ax, sh, material_length, material_width)
-            ax.set_title(f"Sheet {i+1}")
-            st.pyplot(fig)
-            plt.close(fig)
+            png = images[i] if images else sheet_png(sh, material_length, material_width, titles[i])
+            st.image(png, use_container_width=True)
+
+@st.cache_data(show_spinner=False, max_entries=2000)
+def sheet_png(sheet, mat_L, mat_W, title):
+    """
+    Rendered sheet as PNG bytes, cached on the sheet content.
+    """
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(10, 7))
+    ax = fig.subplots()
+    draw_sheet(ax, sheet, mat_L, mat_W)
+    ax.set_title(title)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    return buf.getvalue()
 
 def generate_pdf(sheets, unique_pieces, material_length, material_width):
+    import matplotlib.pyplot as plt
+    import matplotlib.patches as mpatches
+    from matplotlib.backends.backend_pdf import PdfPages
     pdf_buffer = io.BytesIO()
     with PdfPages(pdf_buffer) as pdf:
-        for idx, sheet in enumerate(sheets, start=1):
+        for sheet, title in zip(sheets, sheet_titles(sheets)):
             fig, ax = plt.subplots(figsize=(12, 8))
             draw_sheet(ax, sheet, material_length, material_width)
-            ax.set_title(f"Sheet {idx}")
+            ax.set_title(title)
             plt.tight_layout()
             pdf.savefig(fig)
             plt.close(fig)
         # Legend
         fig_leg, ax_leg = plt.subplots(figsize=(8, 4))
         handles = [
-            mpatches.Patch(color=info["color"], label=f"ID {info['id']}: {size[0]}×{size[1]} mm")
+            mpatches.Patch(color=info["color"], label=f"ID {info['id']}: {size[0]}×{size[1]} mm"
+                           + (f" ({size[2]})" if len(size) > 2 else ""))
             for size, info in sorted(unique_pieces.items(), key=lambda x: x[1]["id"])
         ]
         if handles:
@@ -240,6 +177,23 @@ def generate_pdf(sheets, unique_pieces, material_length, material_width):
     pdf_buffer.seek(0)
     return pdf_buffer
 
+def build_plan_result(pieces, stock_sizes, material_length, material_width, allow_rotation, seed, engine):
+    """
+    Pack, render sheets and PDF. The result is what the plan store keeps.
+    """
+    plan = pack_by_material(pieces, stock_sizes, (material_length, material_width),
+                            allow_rotation=allow_rotation, seed=seed, engine=engine)
+    sheets = plan["sheets"]
+    uniq = assign_piece_ids_and_colors(sheets, pieces, seed=plan["seed"])
+    images = [sheet_png(sh, material_length, material_width, title)
+              for sh, title in zip(sheets, sheet_titles(sheets))]
+    pdf = generate_pdf(sheets, uniq, material_length, material_width).getvalue()
+    return {
+        "plan": {"sheets": sheets, "sheet_counts": plan["sheet_counts"], "pieces": pieces},
+        "pdf": pdf,
+        "images": images,
+    }
+
 # ============================ Run ============================
 if st.sidebar.button("🎯 Generate Cutting Plan", use_container_width=True):
     # Expand rows by quantity
@@ -249,39 +203,77 @@ if st.sidebar.button("🎯 Generate Cutting Plan", use_container_width=True):
             L = int(r["Length (mm)"]); W = int(r["Width (mm)"]); Q = int(r["Quantity"])
         except Exception:
             continue
+        M = str(r["Material"]).strip() if pd.notna(r["Material"]) else ""
         for _ in range(max(0, Q)):
-            pieces.append({'length': L, 'width': W})
+            pieces.append({'length': L, 'width': W, 'material': M or DEFAULT_MATERIAL})
 
     if not pieces:
         st.warning("Please add at least one valid piece.")
         st.stop()
 
-    sheets = greedy_fit_pieces(material_length, material_width, pieces, allow_rotation=allow_rotation)
-    uniq = assign_piece_ids_and_colors(sheets, pieces)
+    # Canonical order so identical jobs share one fingerprint and stored plan
+    pieces.sort(key=lambda p: (p['material'], p['length'], p['width']))
+    used_stock = {m: stock_sizes[m] for m in {p['material'] for p in pieces} if m in stock_sizes}
+    fingerprint = plan_store.job_fingerprint(
+        engine=engine, pieces=[(p['length'], p['width'], p['material']) for p in pieces],
+        sheet=(int(material_length), int(material_width)), stock=sorted(used_stock.items()),
+        rotation=allow_rotation, seed=int(seed),
+    )
+    compute = lambda: build_plan_result(pieces, used_stock, int(material_length), int(material_width),
+                                        allow_rotation, int(seed), engine)
+    try:
+        result, cached = plan_store.get_or_compute(fingerprint, compute)
+    except (sqlite3.Error, TimeoutError) as e:
+        st.caption(f"Plan store unavailable ({e}); computing locally.")
+        result, cached = compute(), False
+    plan = result["plan"]
+    sheets = plan["sheets"]
+    if cached:
+        st.caption("♻️ Loaded from the shared plan store.")
+
+    # Every generated plan is recorded, including ones served from the store
+    try:
+        record_job(sheets, plan["pieces"], material_length, material_width, engine, source="formula_cut")
+    except Exception as e:
+        st.caption(f"Plan not recorded for analytics ({type(e).__name__}: {e}).")
 
     # Textual + metrics
     st.subheader("🔷 Cutting Plan (Textual)")
     total_cut_area = 0
     total_material_area = 0
-    for i, sheet in enumerate(sheets, start=1):
-        st.write(f"**Sheet {i}**")
+    for sheet, title in zip(sheets, sheet_titles(sheets)):
+        st.write(f"**{title}**")
         for c in sheet["cuts"]:
             st.write(f"ID {c['piece_id']}: {int(c['length'])}×{int(c['width'])} mm "
                      f"at ({int(c['x_offset'])}, {int(c['y_offset'])})")
             total_cut_area += c["length"] * c["width"]
-        total_material_area += material_length * material_width
+        total_material_area += sheet["sheet_length"] * sheet["sheet_width"]
 
     waste = total_material_area - total_cut_area
     st.write(f"\nTotal Material Used: {int(total_cut_area):,} mm²")
     st.write(f"Total Waste: {int(waste):,} mm²")
+    if len(plan["sheet_counts"]) > 1:
+        for m, n in plan["sheet_counts"].items():
+            st.write(f"{m}: {n} sheets")
     st.write(f"**Total Sheets Used: {len(sheets)}**")
 
+    with st.expander("📊 Per-Sheet Utilization"):
+        st.dataframe(pd.DataFrame(sheet_metrics(sheets, material_length, material_width)),
+                     use_container_width=True, hide_index=True)
+
     # Plots
-    plot_tabs(material_length, material_width, sheets)
+    plot_tabs(material_length, material_width, sheets, images=result["images"])
 
     # PDF
-    pdf = generate_pdf(sheets, uniq, material_length, material_width)
+    pdf = result["pdf"]
     st.download_button("📥 Download Cutting Plan PDF", data=pdf, file_name="cutting_plan.pdf", mime="application/pdf")
 
+    # Saw / CNC exports
+    cols = st.columns(3)
+    for col, fmt in zip(cols, ["json", "csv", "dxf"]):
+        data, mime = export_bytes(fmt, sheets, plan["pieces"], material_length, material_width)
+        col.download_button(f"📥 {fmt.upper()}", data=data, file_name=f"cutting_plan.{fmt}", mime=mime,
+                            use_container_width=True)
+
 else:
     st.info("Fill inputs and click **Generate Cutting Plan**.")
@@ -6,6 +6,8 @@ from rectpack import newPacker, MaxRectsBssf
 import io
 import random
 
+from plan_analytics import record_job
+
 # ---------------- Utility: pack test for a single sheet ----------------
 def try_pack_in_single_sheet(sheet_W, sheet_H, existing_rects, candidate_rect, algo=MaxRectsBssf):
     """
@@ -275,9 +277,13 @@ def main():
             total_material_area += material_length * material_width
 
         waste = total_material_area - total_cut_area
-        #st.write(f"\nTotal Material Used: {int(total_cut_area)} mm²")
-        #st.write(f"Total Waste: {int(waste)} mm²")
+        st.write(f"\nTotal Material Used: {int(total_cut_area)} mm²")
+        st.write(f"Total Waste: {int(waste)} mm²")
         st.write(f"\nTotal Sheets Used: {len(sheets)}")
+        try:
+            record_job(sheets, pieces, material_length, material_width, "greedy", source="formula_cut_rect")
+        except Exception as e:
+            st.caption(f"Plan not recorded for analytics ({type(e).__name__}: {e}).")
 
         # Visualization (tabs, axes exactly sheet size)
         plot_cutting_plan_tabs(material_length, material_width, sheets)
@@ -0,0 +1,263 @@
+"""
+Utilization analytics across jobs.
+Each recorded job appends per-sheet and per-part rows as Parquet files under one
+directory; once a table has COMPACT_AFTER per-job files they are merged into one
+compacted file. The dashboard (analytics_dashboard.py) aggregates them with pandas.
+"""
+import os
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from plan_export import sheet_numbers
+
+DEFAULT_DIR = os.environ.get("SPACECUT_ANALYTICS_DIR", "analytics")
+TABLES = ("sheets", "parts")
+
+# Per-job files a table may collect before record_job merges them
+COMPACT_AFTER = 100
+
+# ---------------- Per-sheet metrics ----------------
+def _largest_in_histogram(heights, widths):
+    """
+    Largest rectangle under a histogram whose bars have their own widths.
+    Returns: (area, width, height)
+    """
+    best = (0, 0, 0)
+    stack = []   # (start width offset, height)
+    offset = 0
+    for h, w in list(zip(heights, widths)) + [(0, 0)]:
+        start = offset
+        while stack and stack[-1][1] >= h:
+            s, sh = stack.pop()
+            area = (offset - s) * sh
+            if area > best[0]:
+                best = (area, offset - s, sh)
+            start = s
+        stack.append((start, h))
+        offset += w
+    return best
+
+def largest_remnant(sheet, sheet_L, sheet_W):
+    """
+    Largest empty axis-aligned rectangle left on a sheet (the best offcut to keep).
+    Works on the grid spanned by the cut edges. Returns: (area, length, width)
+    """
+    xs = sorted({0, sheet_L} | {min(max(v, 0), sheet_L) for c in sheet["cuts"]
+                                for v in (c["x_offset"], c["x_offset"] + c["length"])})
+    ys = sorted({0, sheet_W} | {min(max(v, 0), sheet_W) for c in sheet["cuts"]
+                                for v in (c["y_offset"], c["y_offset"] + c["width"])})
+    xi = {v: i for i, v in enumerate(xs)}
+    yi = {v: i for i, v in enumerate(ys)}
+    used = np.zeros((len(ys) - 1, len(xs) - 1), dtype=bool)
+    for c in sheet["cuts"]:
+        x0 = xi[min(max(c["x_offset"], 0), sheet_L)]
+        x1 = xi[min(max(c["x_offset"] + c["length"], 0), sheet_L)]
+        y0 = yi[min(max(c["y_offset"], 0), sheet_W)]
+        y1 = yi[min(max(c["y_offset"] + c["width"], 0), sheet_W)]
+        used[y0:y1, x0:x1] = True
+
+    widths = np.diff(xs)
+    heights = np.zeros(len(widths))
+    best = (0, 0, 0)
+    for row, band in zip(used, np.diff(ys)):
+        heights = np.where(row, 0, heights + band)
+        area, w, h = _largest_in_histogram(heights.tolist(), widths.tolist())
+        if area > best[0]:
+            best = (area, w, h)
+    return int(best[0]), int(best[1]), int(best[2])
+
+def sheet_metrics(sheets, material_length, material_width):
+    """
+    One dict per sheet: sheet (numbered within its material), material, sheet_area,
+    used_area, utilization, parts, remnant_area, remnant_length, remnant_width.
+    """
+    rows = []
+    for sheet, s_i in zip(sheets, sheet_numbers(sheets)):
+        L = int(sheet.get("sheet_length", material_length))
+        W = int(sheet.get("sheet_width", material_width))
+        used = sum(c["length"] * c["width"] for c in sheet["cuts"])
+        r_area, r_L, r_W = largest_remnant(sheet, L, W)
+        rows.append({
+            "sheet": s_i, "material": sheet.get("material", ""),
+            "sheet_area": L * W, "used_area": used, "utilization": used / (L * W),
+            "parts": len(sheet["cuts"]),
+            "remnant_area": r_area, "remnant_length": max(r_L, r_W), "remnant_width": min(r_L, r_W),
+        })
+    return rows
+
+# ---------------- Recording ----------------
+def record_job(sheets, pieces, material_length, material_width, engine, source, root=DEFAULT_DIR):
+    """
+    Append one job to the store: root/sheets/<job>.parquet and root/parts/<job>.parquet.
+    Parts carry their sheet's utilization and the piece's 'wardrobe' tag if it has one.
+    Each file is written under a '.'-prefixed name (skipped by readers) and then renamed,
+    so a concurrent load never sees it half-written. Per-job files are merged once a
+    table has more than COMPACT_AFTER of them.
+    Returns: job_id
+    """
+    job_id = f"{int(time.time() * 1000):d}-{uuid.uuid4().hex[:8]}"
+    ts = pd.Timestamp.now(tz="UTC")
+    metrics = sheet_metrics(sheets, material_length, material_width)
+
+    sheets_df = pd.DataFrame(metrics)
+    sheets_df.insert(0, "job_id", job_id)
+    sheets_df.insert(1, "recorded_at", ts)
+    sheets_df.insert(2, "engine", engine)
+    sheets_df.insert(3, "source", source)
+
+    part_rows = []
+    for m, sheet in zip(metrics, sheets):
+        for c in sheet["cuts"]:
+            op = pieces[c["original_idx"]]
+            L, W = int(op["length"]), int(op["width"])
+            part_rows.append({
+                "job_id": job_id, "engine": engine, "sheet": m["sheet"], "material": m["material"],
+                "length": max(L, W), "width": min(L, W), "area": L * W,
+                "wardrobe": op.get("wardrobe", ""), "sheet_utilization": m["utilization"],
+            })
+    parts_df = pd.DataFrame(part_rows, columns=[
+        "job_id", "engine", "sheet", "material", "length", "width", "area", "wardrobe", "sheet_utilization"
+    ])
+
+    for name, df in (("sheets", sheets_df), ("parts", parts_df)):
+        path = os.path.join(root, name)
+        os.makedirs(path, exist_ok=True)
+        _write_atomic(pa.Table.from_pandas(df, preserve_index=False), path, f"{job_id}.parquet")
+    # Both files are in place; compaction is housekeeping and must not fail the job
+    for name in TABLES:
+        path = os.path.join(root, name)
+        try:
+            if sum(not f.startswith("compacted-") for f in _data_files(path)) > COMPACT_AFTER:
+                _compact_table(path, per_job_only=True)
+        except OSError:
+            pass  # e.g. a concurrent compaction removed files; the next job tries again
+    return job_id
+
+def _write_atomic(table, path, filename):
+    tmp = os.path.join(path, f".{filename}.{uuid.uuid4().hex[:8]}.tmp")
+    pq.write_table(table, tmp)
+    os.replace(tmp, os.path.join(path, filename))
+
+def _data_files(path):
+    """
+    Finished Parquet files of a table, compacted ones first. Names starting with
+    '.' or '_' are writes in progress.
+    """
+    names = [f for f in os.listdir(path) if f.endswith(".parquet") and not f.startswith((".", "_"))]
+    return sorted(names, key=lambda f: (not f.startswith("compacted-"), f))
+
+def _read_table(path, files):
+    """
+    Concatenate the given files into one Arrow table, keeping each job once: a job
+    already read from a compacted file is skipped in per-job files and in later
+    compacted files (compaction writes its file before removing the ones it merged).
+    """
+    tables, seen = [], set()
+    for f in files:
+        if f.startswith("compacted-"):
+            t = pq.read_table(os.path.join(path, f))
+            if seen:
+                t = t.filter(pc.invert(pc.is_in(t["job_id"], value_set=pa.array(list(seen), pa.string()))))
+            seen.update(pc.unique(t["job_id"]).to_pylist())
+        else:
+            job_id = f[:-len(".parquet")]
+            if job_id in seen:
+                continue
+            t = pq.read_table(os.path.join(path, f))
+            seen.add(job_id)
+        tables.append(t)
+    return pa.concat_tables(tables, promote_options="default") if tables else None
+
+def _read_listed(path, files_filter=None, retries=5):
+    """
+    List and read a table's files. Returns: (files, Arrow table or None)
+    """
+    for attempt in range(retries):
+        files = _data_files(path) if os.path.isdir(path) else []
+        if files_filter is not None:
+            files = [f for f in files if files_filter(f)]
+        try:
+            return files, _read_table(path, files)
+        except FileNotFoundError:
+            # A compaction removed files after they were listed; list again
+            if attempt == retries - 1:
+                raise
+
+def load_history(root=DEFAULT_DIR):
+    """
+    Returns: (sheets_df, parts_df); empty frames if nothing was recorded yet.
+    """
+    out = []
+    for name in TABLES:
+        _, table = _read_listed(os.path.join(root, name))
+        out.append(pd.DataFrame() if table is None else table.to_pandas())
+    return tuple(out)
+
+def _compact_table(path, per_job_only=False):
+    """
+    Merge a table's files (only the per-job ones if per_job_only) into one compacted file.
+    """
+    only = (lambda f: not f.startswith("compacted-")) if per_job_only else None
+    files, table = _read_listed(path, only)
+    if len(files) < 2:
+        return
+    _write_atomic(table, path, f"compacted-{int(time.time() * 1000):d}-{uuid.uuid4().hex[:8]}.parquet")
+    for f in files:
+        try:
+            os.remove(os.path.join(path, f))
+        except FileNotFoundError:
+            pass  # another compaction got there first
+
+def compact_history(root=DEFAULT_DIR):
+    """
+    Merge all files of each table, earlier compacted ones included, into one file.
+    """
+    for name in TABLES:
+        path = os.path.join(root, name)
+        if os.path.isdir(path):
+            _compact_table(path)
+
+# ---------------- Aggregations ----------------
+def engine_summary(sheets_df):
+    """
+    Per packing engine: jobs, sheets, mean/median utilization, mean largest remnant.
+    """
+    g = sheets_df.groupby("engine")
+    out = pd.DataFrame({
+        "jobs": g["job_id"].nunique(),
+        "sheets": g.size(),
+        "mean_utilization": g["utilization"].mean(),
+        "median_utilization": g["utilization"].median(),
+        "mean_remnant_m2": g["remnant_area"].mean() / 1e6,
+    })
+    return out.sort_values("mean_utilization")
+
+def waste_by_part_size(parts_df, bin_mm=100):
+    """
+    Mean waste share (1 - utilization) of the sheets each part size lands on,
+    with parts binned to bin_mm. Returns a long table: length_bin, width_bin, parts, mean_waste.
+    """
+    df = parts_df.assign(
+        length_bin=(parts_df["length"] // bin_mm) * bin_mm,
+        width_bin=(parts_df["width"] // bin_mm) * bin_mm,
+        waste=1.0 - parts_df["sheet_utilization"].clip(upper=1.0),
+    )
+    return (df.groupby(["length_bin", "width_bin"])
+              .agg(parts=("waste", "size"), mean_waste=("waste", "mean"))
+              .reset_index())
+
+def waste_by_wardrobe(parts_df):
+    """
+    Mean waste share of the sheets carrying each wardrobe type's parts.
+    """
+    df = parts_df[parts_df["wardrobe"] != ""]
+    df = df.assign(waste=1.0 - df["sheet_utilization"].clip(upper=1.0))
+    return (df.groupby("wardrobe")
+              .agg(parts=("waste", "size"), jobs=("job_id", "nunique"), mean_waste=("waste", "mean"))
+              .sort_values("mean_waste", ascending=False))
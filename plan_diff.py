@@ -0,0 +1,80 @@
+"""
+Compare two cut plans (JSON exports from plan_export) sheet by sheet.
+Usage: python plan_diff.py old.json new.json
+Exit code 0 when the plans place the same parts at the same spots, 1 otherwise.
+"""
+import json
+import sys
+from collections import Counter
+
+def _placement(cut):
+    # Geometry only: piece IDs and input indices change with input order
+    return (int(cut["x_offset"]), int(cut["y_offset"]), int(cut["length"]), int(cut["width"]))
+
+def sheets_by_material(plan):
+    """
+    {material: [Counter(placements) per sheet, in order]}
+    """
+    out = {}
+    for sheet in plan["sheets"]:
+        out.setdefault(sheet.get("material", ""), []).append(Counter(_placement(c) for c in sheet["cuts"]))
+    return out
+
+def diff_plans(a, b):
+    """
+    a, b: plan dicts as written by plan_export.write_json.
+    Returns: {
+      'sheet_counts': {material: (n_a, n_b)},
+      'changed': [{'material', 'sheet', 'removed': [...], 'added': [...]}, ...],  # sheet numbered per material
+      'same': bool
+    }
+    """
+    sa, sb = sheets_by_material(a), sheets_by_material(b)
+    result = {"sheet_counts": {}, "changed": []}
+    for material in sorted(set(sa) | set(sb)):
+        la, lb = sa.get(material, []), sb.get(material, [])
+        result["sheet_counts"][material] = (len(la), len(lb))
+        for i in range(max(len(la), len(lb))):
+            ca = la[i] if i < len(la) else Counter()
+            cb = lb[i] if i < len(lb) else Counter()
+            if ca != cb:
+                result["changed"].append({
+                    "material": material, "sheet": i + 1,
+                    "removed": sorted((ca - cb).elements()),
+                    "added": sorted((cb - ca).elements()),
+                })
+    result["same"] = not result["changed"]
+    return result
+
+def format_diff(d):
+    """
+    Human-readable report for diff_plans output.
+    """
+    lines = []
+    for material, (na, nb) in d["sheet_counts"].items():
+        mark = "" if na == nb else f"  ({nb - na:+d})"
+        lines.append(f"{material or '(no material)'}: {na} -> {nb} sheets{mark}")
+    if d["same"]:
+        lines.append("Plans are identical.")
+        return "\n".join(lines)
+    lines.append(f"{len(d['changed'])} sheet(s) changed:")
+    for ch in d["changed"]:
+        lines.append(f"  {ch['material'] or 'Sheet'} #{ch['sheet']}: "
+                     f"-{len(ch['removed'])} +{len(ch['added'])} placements")
+        for (x, y, L, W) in ch["removed"]:
+            lines.append(f"    - {L}×{W} at ({x}, {y})")
+        for (x, y, L, W) in ch["added"]:
+            lines.append(f"    + {L}×{W} at ({x}, {y})")
+    return "\n".join(lines)
+
+def main(argv):
+    if len(argv) != 3:
+        print(__doc__.strip())
+        return 2
+    with open(argv[1], encoding="utf-8") as fa, open(argv[2], encoding="utf-8") as fb:
+        d = diff_plans(json.load(fa), json.load(fb))
+    print(format_diff(d))
+    return 0 if d["same"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
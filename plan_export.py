@@ -0,0 +1,161 @@
+"""
+Machine-readable cut plan exports (JSON, CSV, DXF) for panel saws and nesting software.
+Built straight from the sheets/cuts data, written sheet by sheet to any text stream.
+"""
+import csv
+import io
+import json
+
+CSV_COLUMNS = [
+    "sheet", "material", "sheet_length", "sheet_width", "piece_id", "original_idx",
+    "x_offset", "y_offset", "length", "width", "rotated",
+]
+
+# Space between sheets in the DXF drawing (mm)
+DXF_SHEET_GAP = 100
+
+def sheet_size(sheet, material_length, material_width):
+    return (int(sheet.get("sheet_length", material_length)),
+            int(sheet.get("sheet_width", material_width)))
+
+def sheet_numbers(sheets):
+    """
+    Number of each sheet within its material, in plan order: [1, 2, 1, ...].
+    Exports and the apps both name a sheet by material and this number (see sheet_label).
+    """
+    seen = {}
+    out = []
+    for sheet in sheets:
+        m = sheet.get("material", "")
+        seen[m] = seen.get(m, 0) + 1
+        out.append(seen[m])
+    return out
+
+def sheet_label(sheet, number):
+    """
+    "18mm exterior #2", or "Sheet 2" for sheets without a material.
+    """
+    return f"{sheet['material']} #{number}" if sheet.get("material") else f"Sheet {number}"
+
+def _sheet_placements(sheet, number, pieces, material_length, material_width):
+    sheet_L, sheet_W = sheet_size(sheet, material_length, material_width)
+    for c in sheet["cuts"]:
+        op = pieces[c["original_idx"]]
+        L, W = int(c["length"]), int(c["width"])
+        yield {
+            "sheet": number,
+            "material": sheet.get("material", op.get("material", "")),
+            "sheet_length": sheet_L,
+            "sheet_width": sheet_W,
+            "piece_id": c.get("piece_id"),
+            "original_idx": c["original_idx"],
+            "x_offset": int(c["x_offset"]),
+            "y_offset": int(c["y_offset"]),
+            "length": L,
+            "width": W,
+            "rotated": L != W and (L, W) != (int(op["length"]), int(op["width"])),
+        }
+
+def iter_placements(sheets, pieces, material_length, material_width):
+    """
+    Yields one dict per placed cut (columns as CSV_COLUMNS), sheets numbered from 1
+    within each material (see sheet_numbers).
+    pieces: list or {idx: piece}, as used for original_idx.
+    'rotated' is True when the packed length/width are swapped against the input piece.
+    """
+    for sheet, number in zip(sheets, sheet_numbers(sheets)):
+        yield from _sheet_placements(sheet, number, pieces, material_length, material_width)
+
+# ---------------- JSON ----------------
+def write_json(fp, sheets, pieces, material_length, material_width):
+    """
+    {"material_length", "material_width", "sheet_count",
+     "sheets": [{"sheet", "material", "sheet_length", "sheet_width", "cuts": [...]}, ...]}
+    """
+    fp.write("{")
+    fp.write(f'"material_length": {int(material_length)}, ')
+    fp.write(f'"material_width": {int(material_width)}, ')
+    fp.write(f'"sheet_count": {len(sheets)}, ')
+    fp.write('"sheets": [')
+    for s_i, (sheet, number) in enumerate(zip(sheets, sheet_numbers(sheets))):
+        sheet_L, sheet_W = sheet_size(sheet, material_length, material_width)
+        cuts = [
+            {k: row[k] for k in ("piece_id", "original_idx", "x_offset", "y_offset", "length", "width", "rotated")}
+            for row in _sheet_placements(sheet, number, pieces, material_length, material_width)
+        ]
+        if s_i:
+            fp.write(", ")
+        fp.write(json.dumps({
+            "sheet": number,
+            "material": sheet.get("material", ""),
+            "sheet_length": sheet_L,
+            "sheet_width": sheet_W,
+            "cuts": cuts,
+        }))
+    fp.write("]}\n")
+
+# ---------------- CSV ----------------
+def write_csv(fp, sheets, pieces, material_length, material_width):
+    """
+    One row per placement, header CSV_COLUMNS.
+    """
+    w = csv.writer(fp, lineterminator="\n")
+    w.writerow(CSV_COLUMNS)
+    for row in iter_placements(sheets, pieces, material_length, material_width):
+        w.writerow([row[k] for k in CSV_COLUMNS])
+
+# ---------------- DXF (R12 ASCII) ----------------
+def _dxf_rect(out, layer, x, y, L, W):
+    out.append(f"0\nPOLYLINE\n8\n{layer}\n66\n1\n70\n1\n10\n0.0\n20\n0.0\n30\n0.0\n")
+    for (vx, vy) in ((x, y), (x + L, y), (x + L, y + W), (x, y + W)):
+        out.append(f"0\nVERTEX\n8\n{layer}\n10\n{vx}\n20\n{vy}\n30\n0.0\n")
+    out.append(f"0\nSEQEND\n8\n{layer}\n")
+
+def _dxf_text(out, layer, x, y, height, text):
+    out.append(f"0\nTEXT\n8\n{layer}\n10\n{x}\n20\n{y}\n30\n0.0\n40\n{height}\n1\n{text}\n"
+               f"72\n1\n11\n{x}\n21\n{y}\n31\n0.0\n73\n2\n")
+
+def _dxf_layer(sheet, number):
+    # R12 layer names: letters, digits, '_', '-' and '$' only
+    name = sheet_label(sheet, number).upper().replace(" #", "_")
+    return "".join(ch if ch.isalnum() or ch in "_-$" else "_" for ch in name)
+
+def write_dxf(fp, sheets, pieces, material_length, material_width):
+    """
+    Sheets side by side along X, one layer per sheet named like its label
+    (18MM_EXTERIOR_1, ..., or SHEET_1 without materials).
+    Each sheet has its outline plus one closed polyline and a label per part.
+    DXF Y points up, so plan rows (Y down from the sheet's top edge) are flipped.
+    """
+    fp.write("0\nSECTION\n2\nENTITIES\n")
+    x0 = 0
+    for sheet, number in zip(sheets, sheet_numbers(sheets)):
+        sheet_L, sheet_W = sheet_size(sheet, material_length, material_width)
+        layer = _dxf_layer(sheet, number)
+        out = []
+        _dxf_rect(out, layer, x0, 0, sheet_L, sheet_W)
+        for row in _sheet_placements(sheet, number, pieces, material_length, material_width):
+            L, W = row["length"], row["width"]
+            x = x0 + row["x_offset"]
+            y = sheet_W - row["y_offset"] - W
+            _dxf_rect(out, layer, x, y, L, W)
+            label = f"ID{row['piece_id']} {L}x{W}" if row["piece_id"] is not None else f"{L}x{W}"
+            _dxf_text(out, layer, x + L / 2, y + W / 2, max(10, min(L, W) // 12), label)
+        fp.write("".join(out))
+        x0 += sheet_L + DXF_SHEET_GAP
+    fp.write("0\nENDSEC\n0\nEOF\n")
+
+EXPORTERS = {
+    "json": (write_json, "application/json"),
+    "csv": (write_csv, "text/csv"),
+    "dxf": (write_dxf, "application/dxf"),
+}
+
+def export_bytes(fmt, sheets, pieces, material_length, material_width):
+    """
+    Run one exporter into memory (for download buttons). Returns: (bytes, mime)
+    """
+    writer, mime = EXPORTERS[fmt]
+    buf = io.StringIO()
+    writer(buf, sheets, pieces, material_length, material_width)
+    return buf.getvalue().encode("utf-8"), mime
@@ -0,0 +1,230 @@
+"""
+Shared plan store for several app sessions/processes on one server.
+SQLite in WAL mode holds finished plans, rendered sheet images and PDFs keyed by a job
+fingerprint. Identical jobs requested at the same time are computed once; the other
+callers wait for that result. Old rows are evicted by age and count (see evict).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.environ.get("SPACECUT_PLAN_STORE", "plan_store.sqlite")
+
+# Part of every fingerprint: bump when the packer, sheet rendering or PDF/export
+# output changes, so plans stored by older code are no longer served
+STORE_VERSION = 1
+
+# Finished plans older than MAX_AGE seconds, or beyond the newest MAX_PLANS, are dropped
+MAX_AGE = 7 * 24 * 3600
+MAX_PLANS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    fingerprint TEXT PRIMARY KEY,
+    status      TEXT NOT NULL,          -- 'pending' while one caller computes, then 'done'
+    started     REAL NOT NULL,          -- last heartbeat while pending
+    finished    REAL,
+    plan        TEXT,                   -- JSON
+    pdf         BLOB
+);
+CREATE TABLE IF NOT EXISTS sheet_images (
+    fingerprint TEXT NOT NULL,
+    sheet       INTEGER NOT NULL,
+    png         BLOB NOT NULL,
+    PRIMARY KEY (fingerprint, sheet)
+);
+"""
+
+# One lock per fingerprint so sessions (threads) of this process queue up before SQLite.
+# fingerprint -> [lock, users]; dropped when the last user is done.
+_locks = {}
+_locks_guard = threading.Lock()
+
+def job_fingerprint(**job):
+    """
+    sha256 over the canonical JSON of the job description (pieces, sizes, options...)
+    and STORE_VERSION.
+    """
+    blob = json.dumps({"store_version": STORE_VERSION, "job": job},
+                      sort_keys=True, separators=(",", ":"), default=list)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def connect(path=DEFAULT_PATH):
+    con = sqlite3.connect(path, timeout=30, isolation_level=None)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    con.executescript(_SCHEMA)
+    return con
+
+def load(fingerprint, path=DEFAULT_PATH):
+    """
+    Returns: {'plan', 'pdf', 'images'} for a finished job, or None.
+    """
+    con = connect(path)
+    try:
+        row = con.execute(
+            "SELECT plan, pdf FROM plans WHERE fingerprint=? AND status='done'", (fingerprint,)
+        ).fetchone()
+        if row is None:
+            return None
+        images = [png for (png,) in con.execute(
+            "SELECT png FROM sheet_images WHERE fingerprint=? ORDER BY sheet", (fingerprint,))]
+        return {"plan": json.loads(row[0]), "pdf": row[1], "images": images}
+    finally:
+        con.close()
+
+def save(fingerprint, result, path=DEFAULT_PATH):
+    """
+    Store a finished result {'plan': JSON-able, 'pdf': bytes|None, 'images': [png bytes]}.
+    """
+    con = connect(path)
+    try:
+        con.execute("BEGIN IMMEDIATE")
+        con.execute(
+            "INSERT OR REPLACE INTO plans(fingerprint, status, started, finished, plan, pdf) "
+            "VALUES (?, 'done', ?, ?, ?, ?)",
+            (fingerprint, time.time(), time.time(), json.dumps(result["plan"]), result.get("pdf"))
+        )
+        con.execute("DELETE FROM sheet_images WHERE fingerprint=?", (fingerprint,))
+        con.executemany(
+            "INSERT INTO sheet_images(fingerprint, sheet, png) VALUES (?, ?, ?)",
+            [(fingerprint, i, png) for i, png in enumerate(result.get("images") or [])]
+        )
+        con.execute("COMMIT")
+    finally:
+        con.close()
+
+def evict(path=DEFAULT_PATH, max_age=MAX_AGE, max_plans=MAX_PLANS):
+    """
+    Drop finished plans older than max_age seconds or beyond the newest max_plans,
+    pending rows with no heartbeat for max_age, and their sheet images.
+    """
+    con = connect(path)
+    try:
+        con.execute("BEGIN IMMEDIATE")
+        cutoff = time.time() - max_age
+        con.execute("DELETE FROM plans WHERE status='done' AND finished < ?", (cutoff,))
+        con.execute("DELETE FROM plans WHERE status='pending' AND started < ?", (cutoff,))
+        con.execute(
+            "DELETE FROM plans WHERE status='done' AND fingerprint NOT IN "
+            "(SELECT fingerprint FROM plans WHERE status='done' ORDER BY finished DESC LIMIT ?)",
+            (max_plans,)
+        )
+        con.execute("DELETE FROM sheet_images WHERE fingerprint NOT IN (SELECT fingerprint FROM plans)")
+        con.execute("COMMIT")
+    finally:
+        con.close()
+
+def _claim(fingerprint, path, stale_after):
+    """
+    Mark the job pending if nobody has it, or if its worker sent no heartbeat
+    for stale_after seconds (it died).
+    Returns: 'claimed', 'pending' or 'done'.
+    """
+    con = connect(path)
+    try:
+        con.execute("BEGIN IMMEDIATE")
+        row = con.execute("SELECT status, started FROM plans WHERE fingerprint=?", (fingerprint,)).fetchone()
+        if row is None or (row[0] == "pending" and time.time() - row[1] > stale_after):
+            con.execute(
+                "INSERT OR REPLACE INTO plans(fingerprint, status, started) VALUES (?, 'pending', ?)",
+                (fingerprint, time.time())
+            )
+            con.execute("COMMIT")
+            return "claimed"
+        con.execute("COMMIT")
+        return row[0]
+    finally:
+        con.close()
+
+def _heartbeat(fingerprint, path, stop, interval):
+    """
+    Refresh the pending row's timestamp every `interval` seconds until `stop` is set,
+    so a slow but healthy compute is not taken over as stale.
+    """
+    while not stop.wait(interval):
+        try:
+            con = connect(path)
+            try:
+                con.execute("UPDATE plans SET started=? WHERE fingerprint=? AND status='pending'",
+                            (time.time(), fingerprint))
+            finally:
+                con.close()
+        except sqlite3.Error:
+            pass  # try again on the next beat
+
+def _release(fingerprint, path):
+    con = connect(path)
+    try:
+        con.execute("DELETE FROM plans WHERE fingerprint=? AND status='pending'", (fingerprint,))
+    finally:
+        con.close()
+
+def get_or_compute(fingerprint, compute, path=DEFAULT_PATH, timeout=600, poll=0.2, stale_after=60):
+    """
+    Finished result for the fingerprint, running compute() only if no one has it yet.
+    compute() must return {'plan', 'pdf', 'images'} as for save().
+    Concurrent identical requests (threads or processes) wait for the first one, which
+    sends a heartbeat every stale_after / 3 seconds; a job without a heartbeat for
+    stale_after seconds is taken over. Waiting longer than timeout raises TimeoutError.
+    Returns: (result, cached) where cached is False only for the caller that computed it.
+    """
+    if timeout <= stale_after:
+        raise ValueError("timeout must be longer than stale_after")
+    with _locks_guard:
+        entry = _locks.setdefault(fingerprint, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            return _get_or_compute(fingerprint, compute, path, timeout, poll, stale_after)
+    finally:
+        with _locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _locks[fingerprint]
+
+def _get_or_compute(fingerprint, compute, path, timeout, poll, stale_after):
+    deadline = time.time() + timeout
+    while True:
+        hit = load(fingerprint, path)
+        if hit is not None:
+            return hit, True
+        state = _claim(fingerprint, path, stale_after)
+        if state == "claimed":
+            break
+        if state == "done":
+            continue
+        if time.time() > deadline:
+            raise TimeoutError(f"Timed out waiting for plan {fingerprint[:12]}")
+        time.sleep(poll)
+
+    stop = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(fingerprint, path, stop, stale_after / 3), daemon=True)
+    beat.start()
+    try:
+        result = compute()
+    except BaseException:
+        stop.set()
+        beat.join()
+        _release(fingerprint, path)
+        raise
+    stop.set()
+    beat.join()
+    try:
+        save(fingerprint, result, path)
+    except sqlite3.Error:
+        # Keep the result; free the claim so other callers compute instead of waiting
+        # (if even that fails, the row goes stale now that the heartbeat stopped)
+        try:
+            _release(fingerprint, path)
+        except sqlite3.Error:
+            pass
+        return result, False
+    try:
+        evict(path)
+    except sqlite3.Error:
+        pass  # the result is stored; eviction runs again after the next save
+    return result, False
@@ -0,0 +1,194 @@
+"""
+Declarative wardrobe types: a table of inputs, derived values and parts whose sizes are
+formulas over the inputs (length, depth, T_ALL, groove_thick, ...).
+Each type is compiled once into a plain Python function that works on scalars or NumPy arrays.
+
+Spec layout:
+{
+  "label": "2-Door Cupboard", "key": "t1",
+  "inputs":  [(name, label, default, min, max, step), ...],   # int default -> integer input
+  "derived": [(name, expr), ...],                              # evaluated in order
+  "parts":   [{"name", "qty", "length", "width", "when"?, "thickness"?, "finish"?}, ...],
+}
+"""
+import ast
+import keyword
+import numpy as np
+
+DEFAULT_PART = {"when": "True", "thickness": "mat_thick", "finish": "interior"}
+
+# Functions formulas may call. and/or/not don't work on arrays, so conditions
+# combine with all_/any_/not_ instead (e.g. "all_(shelves > 0, drawers > 0)").
+FUNCS = {
+    "min": np.minimum,
+    "max": np.maximum,
+    "all_": np.logical_and,
+    "any_": np.logical_or,
+    "not_": np.logical_not,
+}
+
+def where(cond, a, b):
+    """
+    a if cond else b, elementwise when any argument is an array.
+    """
+    if np.ndim(cond) == 0 and np.ndim(a) == 0 and np.ndim(b) == 0:
+        return a if cond else b
+    return np.where(cond, a, b)
+
+FUNCS["where"] = where
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name,
+    ast.Load, ast.Constant, ast.operator, ast.UAdd, ast.USub, ast.cmpop,
+)
+
+def _check_name(name, where_):
+    """
+    Input and derived names are pasted into the generated source, so they must be
+    plain identifiers that don't shadow a keyword or a FUNCS entry.
+    """
+    if not isinstance(name, str) or not name.isidentifier() or keyword.iskeyword(name) \
+            or name in FUNCS or name.startswith("_"):
+        raise ValueError(f"{where_}: invalid name {name!r}")
+    return name
+
+def _check_expr(expr, known, where_):
+    """
+    Parse one formula and make sure it only uses arithmetic, single comparisons,
+    FUNCS calls and names defined before it.
+    """
+    try:
+        tree = ast.parse(str(expr), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"{where_}: bad formula {expr!r}: {e.msg}")
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.BoolOp, ast.Not)):
+            raise ValueError(f"{where_}: use all_/any_/not_ instead of and/or/not in {expr!r}")
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"{where_}: {type(node).__name__} not allowed in {expr!r}")
+        if isinstance(node, ast.Compare) and len(node.ops) > 1:
+            raise ValueError(f"{where_}: chained comparison in {expr!r}, use all_(a < b, b < c)")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in FUNCS):
+            raise ValueError(f"{where_}: only {sorted(FUNCS)} may be called in {expr!r}")
+        if isinstance(node, ast.Name) and node.id not in known and node.id not in FUNCS \
+                and node.id not in ("True", "False"):
+            raise ValueError(f"{where_}: unknown name {node.id!r} in {expr!r}")
+    return str(expr)
+
+# ---------------- Compile ----------------
+def compile_type(spec):
+    """
+    Build the evaluator for a spec. Returns fn(**inputs) -> tuple of
+    (qty, length, width, when, thickness) per part, in spec order.
+    """
+    label = spec["label"]
+    args = [_check_name(i[0], f"{label}: input") for i in spec["inputs"]]
+    known = set(args)
+    lines = [f"def _evaluate({', '.join(args)}):"]
+    for name, expr in spec.get("derived", []):
+        _check_name(name, f"{label}: derived")
+        lines.append(f"    {name} = ({_check_expr(expr, known, f'{label}: {name}')})")
+        known.add(name)
+    lines.append("    return (")
+    for part in spec["parts"]:
+        part = dict(DEFAULT_PART, **part)
+        exprs = [_check_expr(part[k], known, f"{label}: {part['name']}")
+                 for k in ("qty", "length", "width", "when", "thickness")]
+        lines.append("        (" + ", ".join(f"({e})" for e in exprs) + "),")
+    lines.append("    )")
+
+    ns = dict(FUNCS)
+    exec(compile("\n".join(lines), f"<wardrobe {label}>", "exec"), ns)
+    return ns["_evaluate"]
+
+# id(spec) -> (spec, evaluator); the spec is kept so its id can't be reused.
+# Not stored on the spec itself: a dict(parent, parts=...) copy would inherit it.
+_evaluators = {}
+
+def get_evaluator(spec):
+    """
+    Compiled evaluator for a spec, built on first use.
+    """
+    entry = _evaluators.get(id(spec))
+    if entry is None or entry[0] is not spec:
+        entry = _evaluators[id(spec)] = (spec, compile_type(spec))
+    return entry[1]
+
+def input_defaults(spec):
+    return {i[0]: i[2] for i in spec["inputs"]}
+
+# ---------------- Evaluate ----------------
+def part_material(thickness, finish):
+    """
+    Material tag the packer partitions on, e.g. "18mm exterior".
+    """
+    return f"{float(thickness):g}mm {finish}"
+
+def evaluate(spec, data):
+    """
+    Scalar evaluation for one input dict (missing inputs use their defaults).
+    Returns part rows for the parts whose 'when' holds:
+    [{'name', 'qty', 'length', 'width', 'thickness', 'finish', 'material'}, ...]
+    """
+    values = dict(input_defaults(spec), **{k: v for k, v in data.items() if k in input_defaults(spec)})
+    rows = []
+    for part, (qty, L, W, when, thickness) in zip(spec["parts"], get_evaluator(spec)(**values)):
+        if not when:
+            continue
+        finish = part.get("finish", DEFAULT_PART["finish"])
+        rows.append({
+            "name": part["name"], "qty": int(qty), "length": float(L), "width": float(W),
+            "thickness": float(thickness), "finish": finish,
+            "material": part_material(thickness, finish),
+        })
+    return rows
+
+def evaluate_bulk(spec, columns):
+    """
+    Vectorized evaluation over many configurations.
+    columns: {input: array-like}; missing inputs use their defaults.
+    Returns: {part name: (qty, length, width, material)} arrays with qty 0 where 'when' is false.
+    """
+    defaults = input_defaults(spec)
+    n = max((np.size(v) for v in columns.values()), default=1)
+    values = {k: np.broadcast_to(np.asarray(columns.get(k, d)), (n,)) for k, d in defaults.items()}
+    out = {}
+    for part, (qty, L, W, when, thickness) in zip(spec["parts"], get_evaluator(spec)(**values)):
+        qty = np.where(np.broadcast_to(when, (n,)), np.broadcast_to(qty, (n,)), 0)
+        finish = part.get("finish", DEFAULT_PART["finish"])
+        material = np.array([part_material(t, finish) for t in np.broadcast_to(thickness, (n,))])
+        out[part["name"]] = (qty.astype(int), np.broadcast_to(L, (n,)), np.broadcast_to(W, (n,)), material)
+    return out
+
+# ---------------- Display / Form ----------------
+def format_lines(rows):
+    """
+    Display lines for evaluated part rows: "Top Panel: 1 pc — 1686.0 mm × 600.0 mm".
+    """
+    def mm(val): return f"{round(val,1)} mm"
+    return [f"{r['name']}: {r['qty']} {'pc' if r['qty'] == 1 else 'pcs'} — {mm(r['length'])} × {mm(r['width'])}"
+            for r in rows]
+
+def make_calc(spec):
+    def calc(data):
+        return format_lines(evaluate(spec, data))
+    return calc
+
+def make_form(spec):
+    """
+    Streamlit form body for a spec: one number_input per input, then the submit button.
+    Streamlit is only imported when the form is drawn, so evaluating specs doesn't need it.
+    """
+    def form(prefill=None, button_label="Save"):
+        import streamlit as st
+        if prefill is None:
+            prefill = {}
+        data = {}
+        for (name, label, default, lo, hi, step) in spec["inputs"]:
+            data[name] = st.number_input(
+                label, min_value=lo, max_value=hi, value=prefill.get(name, default),
+                step=step, key=f"{spec['key']}_{name}"
+            )
+        submitted = st.form_submit_button(button_label)
+        return submitted, data
+    return form
@@ -0,0 +1,56 @@
+"""
+Numeric part lists for the wardrobe types, ready for the packer.
+Types are the declarative specs from wardrobe_typeN (see wardrobe_formulas).
+"""
+from functools import lru_cache
+
+from wardrobe_formulas import evaluate, format_lines, input_defaults
+import wardrobe_type1
+import wardrobe_type2
+import wardrobe_type3
+
+# label -> spec; a new wardrobe type only needs its spec added here
+TYPES = {spec["label"]: spec for spec in (wardrobe_type1.SPEC, wardrobe_type2.SPEC, wardrobe_type3.SPEC)}
+
+DEFAULT_INPUTS = {label: input_defaults(spec) for label, spec in TYPES.items()}
+
+def input_key(data):
+    """
+    Hashable key for a wardrobe input dict.
+    """
+    return tuple(sorted(data.items()))
+
+@lru_cache(maxsize=4096)
+def _parts(type_label, key):
+    return tuple(evaluate(TYPES[type_label], dict(key)))
+
+def wardrobe_parts(type_label, data):
+    """
+    Part rows for a wardrobe type and its input dict, memoized on the inputs so
+    unchanged wardrobes are not recomputed:
+    [{'name', 'qty', 'length', 'width', 'thickness', 'finish', 'material'}, ...]
+    """
+    return [dict(p) for p in _parts(type_label, input_key(data))]
+
+def calc_lines(type_label, data):
+    """
+    Display lines for a wardrobe (same as calc_typeN), from the memoized part rows.
+    """
+    return format_lines(_parts(type_label, input_key(data)))
+
+def expand_pieces(parts):
+    """
+    Expand part rows by quantity into packer pieces [{'length','width','material'}, ...].
+    Rows with non-positive size or quantity are skipped.
+    """
+    pieces = []
+    for p in parts:
+        L, W = int(p["length"]), int(p["width"])
+        if L <= 0 or W <= 0:
+            continue
+        for _ in range(max(0, p["qty"])):
+            piece = {"length": L, "width": W}
+            if p.get("material"):
+                piece["material"] = p["material"]
+            pieces.append(piece)
+    return pieces
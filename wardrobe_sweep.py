@@ -0,0 +1,219 @@
+"""
+Design-space sweep: run wardrobe configurations through the packer and compare sheets/cost.
+Run with: streamlit run wardrobe_sweep.py
+"""
+import streamlit as st
+import pandas as pd
+import numpy as np
+import itertools
+
+from cut_engine import ENGINES, pack_many
+from wardrobe_formulas import evaluate_bulk
+from wardrobe_parts import TYPES, DEFAULT_INPUTS
+
+SWEEP_KEYS = ["length", "depth", "height", "shelves", "left_shelves", "right_shelves", "drawers"]
+
+# ---------------- Variants ----------------
+def build_variants(type_label, grid, base=None):
+    """
+    grid: {'length': [1800, 2000], 'shelves': [2, 3], ...}
+    Keys the wardrobe type doesn't use are ignored (e.g. 'shelves' for 3-door types).
+    Returns: list of input dicts, one per combination.
+    """
+    base = dict(DEFAULT_INPUTS[type_label] if base is None else base)
+    keys = [k for k, vals in grid.items() if k in base and len(vals) > 0]
+    variants = []
+    for combo in itertools.product(*[grid[k] for k in keys]):
+        data = dict(base)
+        data.update(zip(keys, combo))
+        variants.append(data)
+    return variants
+
+def variant_sizes(type_label, variants):
+    """
+    Piece sizes per variant, all variants evaluated in one vectorized pass.
+    Each entry is a sorted tuple of (L, W, material), so equal part lists share one packing result.
+    """
+    if not variants:
+        return []
+    cols = {k: np.array([v[k] for v in variants]) for k in variants[0]}
+    bulk = evaluate_bulk(TYPES[type_label], cols)
+    out = []
+    for i in range(len(variants)):
+        sizes = []
+        for qty, L, W, material in bulk.values():
+            l, w, q = int(L[i]), int(W[i]), int(qty[i])
+            if l > 0 and w > 0:
+                sizes.extend([(l, w, str(material[i]))] * q)
+        out.append(tuple(sorted(sizes)))
+    return out
+
+def type_materials(type_labels):
+    """
+    Materials the given types use with their default inputs, in name order.
+    """
+    return sorted({m for t in type_labels for sizes in variant_sizes(t, [DEFAULT_INPUTS[t]])
+                   for (_, _, m) in sizes})
+
+# ---------------- Sweep ----------------
+def sweep(type_labels, grid, material_length=2140, material_width=1200,
+          sheet_price=0.0, allow_rotation=True, max_workers=None, engine="greedy",
+          stock_sizes=None, sheet_prices=None):
+    """
+    Each variant is packed per material, on stock_sizes[material] (default: the
+    material size) and priced at sheet_prices[material] (default: sheet_price).
+    Returns a DataFrame with one row per (type, variant):
+    type, swept parameters, pieces, sheets, cost, utilization, then
+    '<material> sheets' and '<material> cost' per material.
+    """
+    stock_sizes = stock_sizes or {}
+    sheet_prices = sheet_prices or {}
+    rows = []
+    for t in type_labels:
+        variants = build_variants(t, grid)
+        for data, sizes in zip(variants, variant_sizes(t, variants)):
+            row = {"type": t}
+            row.update({k: data[k] for k in SWEEP_KEYS if k in data})
+            row["pieces"] = len(sizes)
+            row["_sizes"] = sizes
+            rows.append(row)
+
+    keys = {r["_sizes"] for r in rows if r["_sizes"]}
+    packed = pack_many(keys, stock_sizes, (material_length, material_width), allow_rotation,
+                       max_workers, engine)
+
+    materials = sorted({m for res in packed.values() for m in res})
+    for r in rows:
+        res = packed.get(r.pop("_sizes"))
+        if res is None:
+            r["sheets"], r["cost"], r["utilization"] = None, None, None
+            continue
+        sheets = cost = cut_area = sheet_area = 0
+        for m in materials:
+            n, area = res.get(m, (0, 0))
+            L, W = stock_sizes.get(m, (material_length, material_width))
+            price = sheet_prices.get(m, sheet_price)
+            r[f"{m} sheets"] = n
+            r[f"{m} cost"] = n * price
+            sheets += n
+            cost += n * price
+            cut_area += area
+            sheet_area += n * L * W
+        r["sheets"] = sheets
+        r["cost"] = cost
+        r["utilization"] = round(cut_area / sheet_area, 4) if sheet_area else 0.0
+    df = pd.DataFrame(rows)
+    per_material = [c for m in materials for c in (f"{m} sheets", f"{m} cost") if c in df.columns]
+    return df[[c for c in df.columns if c not in per_material] + per_material]
+
+def sweep_heatmap(df, x, y, value="sheets", type_label=None):
+    """
+    Pivot a sweep result into a y-by-x table of `value` (min over other swept parameters).
+    """
+    if type_label is not None:
+        df = df[df["type"] == type_label]
+    return df.pivot_table(index=y, columns=x, values=value, aggfunc="min")
+
+# ---------------- Streamlit App ----------------
+def _parse_values(text):
+    vals = []
+    for tok in text.replace(";", ",").split(","):
+        tok = tok.strip()
+        if not tok:
+            continue
+        try:
+            vals.append(float(tok) if "." in tok else int(tok))
+        except ValueError:
+            continue
+    return vals
+
+def main():
+    import matplotlib.pyplot as plt
+
+    st.set_page_config(page_title="Wardrobe Design Sweep", layout="wide")
+    st.title("📊 Wardrobe Design Sweep")
+
+    with st.sidebar:
+        st.markdown("## ⚙️Original Material Size")
+        material_length = st.number_input("Material Length (mm)", min_value=1, value=2140)
+        material_width  = st.number_input("Material Width (mm)",  min_value=1, value=1200)
+        sheet_price = st.number_input("Price per Sheet", min_value=0.0, value=0.0, step=1.0)
+        engine = st.selectbox("Packing Engine", list(ENGINES.keys()))
+
+        st.markdown("---")
+        types = st.multiselect("Wardrobe Types", list(TYPES.keys()), default=["3-Door Cupboard Type 1"])
+
+        # Stock size and price per material (defaults to the values above)
+        materials = type_materials(types)
+        stock_sizes, sheet_prices = {}, {}
+        if materials:
+            st.markdown("## 🧱 Stock per Material")
+            stock_df = st.data_editor(
+                pd.DataFrame({
+                    "Material": materials,
+                    "Length (mm)": [material_length] * len(materials),
+                    "Width (mm)": [material_width] * len(materials),
+                    "Price per Sheet": [sheet_price] * len(materials),
+                }),
+                disabled=["Material"], use_container_width=True, hide_index=True, key="stock_table"
+            )
+            for _, r in stock_df.iterrows():
+                try:
+                    stock_sizes[r["Material"]] = (int(r["Length (mm)"]), int(r["Width (mm)"]))
+                    sheet_prices[r["Material"]] = float(r["Price per Sheet"])
+                except Exception:
+                    continue
+        st.caption("Comma separated values; leave empty to keep the default.")
+        grid = {
+            "length": _parse_values(st.text_input("Length (mm)", "1800, 1900, 2000, 2100")),
+            "depth": _parse_values(st.text_input("Depth (mm)", "")),
+            "height": _parse_values(st.text_input("Height (mm)", "")),
+            "shelves": _parse_values(st.text_input("Shelves (2-door)", "2, 3, 4")),
+            "left_shelves": _parse_values(st.text_input("Left Shelves (3-door)", "")),
+            "right_shelves": _parse_values(st.text_input("Right Shelves (3-door)", "2, 3, 4, 5")),
+            "drawers": _parse_values(st.text_input("Number of Drawers", "")),
+        }
+        run = st.button("🎯 Run Sweep", use_container_width=True)
+
+    # Keep the last result so changing heatmap axes doesn't need a re-run
+    if run:
+        st.session_state["sweep_df"] = sweep(types, grid, material_length, material_width, sheet_price,
+                                             engine=engine, stock_sizes=stock_sizes,
+                                             sheet_prices=sheet_prices)
+    df = st.session_state.get("sweep_df")
+    if df is None:
+        st.info("Pick wardrobe types and values, then click **Run Sweep**.")
+        return
+    if df.empty:
+        st.warning("No variants to evaluate.")
+        return
+
+    st.subheader("🔷 Sheets and Cost per Variant")
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+    swept = [k for k in SWEEP_KEYS if len(grid[k]) > 1 and k in df.columns]
+    if len(swept) >= 2:
+        st.subheader("🔷 Heatmap")
+        c1, c2, c3 = st.columns(3)
+        x = c1.selectbox("X axis", swept, index=0)
+        y = c2.selectbox("Y axis", swept, index=1)
+        value = c3.selectbox("Value", ["sheets", "cost", "utilization"])
+        for t in df["type"].unique():
+            hm = sweep_heatmap(df, x, y, value, type_label=t)
+            if hm.empty:
+                continue
+            fig, ax = plt.subplots(figsize=(8, 5))
+            im = ax.imshow(hm.values, cmap="viridis", aspect="auto")
+            ax.set_xticks(range(len(hm.columns)), [str(c) for c in hm.columns])
+            ax.set_yticks(range(len(hm.index)), [str(i) for i in hm.index])
+            for (i, j), v in pd.DataFrame(hm.values).stack().items():
+                ax.text(j, i, f"{v:g}", ha="center", va="center", color="white", fontsize=8)
+            ax.set_xlabel(x)
+            ax.set_ylabel(y)
+            ax.set_title(f"{t} — {value}")
+            fig.colorbar(im, ax=ax)
+            st.pyplot(fig)
+            plt.close(fig)
+
+if __name__ == "__main__":
+    main()
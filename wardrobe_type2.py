@@ -1,71 +1,63 @@
 #"3-Door Cupboard"
-import streamlit as st
-
-def form_type2(prefill=None, button_label="Save"):
-    if prefill is None:
-        prefill = {}
-    length = st.number_input("Length (mm)", min_value=300.0, value=prefill.get("length", 2100.0), step=1.0, key="t2_length")
-    depth = st.number_input("Depth (mm)", min_value=300.0, value=prefill.get("depth", 600.0), step=1.0, key="t2_depth")
-    height = st.number_input("Height (mm)", min_value=900.0, value=prefill.get("height", 2140.0), step=1.0, key="t2_height")
-    mat_thick = st.number_input("Material Thickness (mm)", min_value=0.0, value=prefill.get("mat_thick", 18.0), step=0.5, key="t2_mt")
-    inside_lam = st.number_input("Inside Laminate (mm)", min_value=0.0, value=prefill.get("inside_lam", 1.0), step=0.5, key="t2_inlam")
-    outside_lam = st.number_input("Outside Laminate (mm)", min_value=0.0, value=prefill.get("outside_lam", 1.0), step=0.5, key="t2_outlam")
-    plinth = st.number_input("Bottom Height (mm)", min_value=0.0, value=prefill.get("plinth", 100.0), step=1.0, key="t2_plinth")
-    left_shelves = st.number_input("Number of Left Shelves", min_value=0, max_value=20, value=prefill.get("left_shelves", 2), step=1, key="tl2_shelves")
-    right_shelves = st.number_input("Number of Right Shelves", min_value=0, max_value=20, value=prefill.get("right_shelves", 4), step=1, key="tr2_shelves")
-    drawers = st.number_input("Number of Drawers", min_value=0, max_value=6, value=prefill.get("drawers", 2), step=1, key="t2_drawers")
-    drawer_h = st.number_input("Drawer Height (mm)", min_value=50.0, value=prefill.get("drawer_h", 150.0), step=1.0, key="t2_drawerh")
-    submitted = st.form_submit_button(button_label)
-    return submitted, {
-        "length": length, "depth": depth, "height": height,
-        "mat_thick": mat_thick, "inside_lam": inside_lam,
-        "outside_lam": outside_lam, "plinth": plinth,
-        "drawers": drawers, "drawer_h": drawer_h,
-        "left_shelves": left_shelves, "right_shelves": right_shelves
-    }
-
-def calc_type2(data):
-    def mm(val): return f"{round(val,1)} mm"
-    groove_thick = 6.0
-    T_ALL = data["mat_thick"] + data["inside_lam"] + data["outside_lam"]
-    out = []
-
-    out.append(f"Side Panels: 2 pcs — {mm(data['height'])} × {mm(data['depth'])}")
-    out.append(f"Top Panel: 1 pc — {mm(data['length'] - 2*T_ALL)} × {mm(data['depth'])}")
-    out.append(f"Bottom Panel: 1 pc — {mm(data['length'] - 2*T_ALL)} × {mm(data['depth'])}")
-    out.append(f"Back Panel (6mm): 1 pc — {mm(data['height'] - data['plinth'] - 2*groove_thick)} × {mm(data['length'] - 2*groove_thick)}")
-    out.append(f"Partition: 1 pcs — {mm(data['height']  - data['plinth'] - 2*T_ALL)} × {mm(data['depth'] - groove_thick)}")
-
-
-    if data.get("left_shelves", 0) > 0:
-        shelf_len = ((data["length"] - 3*T_ALL) * 2)/3
-        shelf_dep = data["depth"] - T_ALL - groove_thick
-        out.append(f"Left Shelves: {data['left_shelves']} pcs — {mm(shelf_len)} × {mm(shelf_dep)}")
-     
-    if data.get("right_shelves", 0) > 0:
-        shelf_len = (data["length"] - 3*T_ALL) /3
-        shelf_dep = data["depth"] - T_ALL - groove_thick
-        out.append(f"Right Shelves: {data['right_shelves']} pcs — {mm(shelf_len)} × {mm(shelf_dep)}")
-
-    door_w = (data["length"] / 3) - (2 * data["outside_lam"])
-    door_h = data["height"] - data["plinth"]
-    out.append(f"Doors: 3 pcs — {mm(door_h)} × {mm(door_w)}")
-
-    if data.get("drawers", 0) > 0:
-        drawer_side = data["depth"] - 3*T_ALL
-        out.append(f"Drawer Sides: {data['drawers']*2} pcs — {mm(drawer_side)} × {mm(data['drawer_h'] - 2*T_ALL)}")
-        out.append(f"Drawer Back: {data['drawers']} pcs — {mm(shelf_len - 5*T_ALL)} × {mm(data['drawer_h'] - 2*T_ALL)}")
-        out.append(f"Drawer Front: {data['drawers']} pcs — {mm(shelf_len - 5*T_ALL) } × {mm((data['drawer_h'] - 2*T_ALL)/2)}")
-        out.append(f"Drawer Bottoms - (6mm): {data['drawers']} pcs — {mm(shelf_len - 3*T_ALL)} × {mm(data['depth'] - 2*T_ALL)}")
-        out.append(f"Side Extra Pieces: {data['drawers']*3} pcs — {mm(drawer_side) } × {mm(data['drawer_h'] - T_ALL)}")
-        out.append(f"Front Extra Pieces: {data['drawers']} pcs — {mm(shelf_len - 1*T_ALL) } × {mm(data['drawer_h'] - T_ALL)}")
-    
-
-
-
-
-    
-    out.append(f"Front Extra Pieces on Down: 1 pcs — {mm(data['length'] - 2*T_ALL + 2)} × {data["plinth"]}")
-
-    return out
-
+from wardrobe_formulas import make_form, make_calc
+
+SPEC = {
+    "label": "3-Door Cupboard Type 1",
+    "key": "t2",
+    "image": "3door.png",
+    "inputs": [
+        # (name, label, default, min, max, step)
+        ("length", "Length (mm)", 2100.0, 300.0, None, 1.0),
+        ("depth", "Depth (mm)", 600.0, 300.0, None, 1.0),
+        ("height", "Height (mm)", 2140.0, 900.0, None, 1.0),
+        ("mat_thick", "Material Thickness (mm)", 18.0, 0.0, None, 0.5),
+        ("inside_lam", "Inside Laminate (mm)", 1.0, 0.0, None, 0.5),
+        ("outside_lam", "Outside Laminate (mm)", 1.0, 0.0, None, 0.5),
+        ("plinth", "Bottom Height (mm)", 100.0, 0.0, None, 1.0),
+        ("left_shelves", "Number of Left Shelves", 2, 0, 20, 1),
+        ("right_shelves", "Number of Right Shelves", 4, 0, 20, 1),
+        ("drawers", "Number of Drawers", 2, 0, 6, 1),
+        ("drawer_h", "Drawer Height (mm)", 150.0, 50.0, None, 1.0),
+    ],
+    "derived": [
+        ("groove_thick", "6.0"),
+        ("T_ALL", "mat_thick + inside_lam + outside_lam"),
+        ("left_shelf_len", "((length - 3*T_ALL) * 2)/3"),
+        ("right_shelf_len", "(length - 3*T_ALL) /3"),
+        ("shelf_dep", "depth - T_ALL - groove_thick"),
+        # Drawers sit in the right-hand section
+        ("shelf_len", "where(right_shelves > 0, right_shelf_len, left_shelf_len)"),
+        ("door_w", "(length / 3) - (2 * outside_lam)"),
+        ("door_h", "height - plinth"),
+        ("drawer_side", "depth - 3*T_ALL"),
+    ],
+    "parts": [
+        {"name": "Side Panels", "qty": "2", "length": "height", "width": "depth", "finish": "exterior"},
+        {"name": "Top Panel", "qty": "1", "length": "length - 2*T_ALL", "width": "depth"},
+        {"name": "Bottom Panel", "qty": "1", "length": "length - 2*T_ALL", "width": "depth"},
+        {"name": "Back Panel (6mm)", "qty": "1", "length": "height - plinth - 2*groove_thick",
+         "width": "length - 2*groove_thick", "thickness": "6", "finish": "plain"},
+        {"name": "Partition", "qty": "1", "length": "height - plinth - 2*T_ALL", "width": "depth - groove_thick"},
+        {"name": "Left Shelves", "qty": "left_shelves", "length": "left_shelf_len", "width": "shelf_dep",
+         "when": "left_shelves > 0"},
+        {"name": "Right Shelves", "qty": "right_shelves", "length": "right_shelf_len", "width": "shelf_dep",
+         "when": "right_shelves > 0"},
+        {"name": "Doors", "qty": "3", "length": "door_h", "width": "door_w", "finish": "exterior"},
+        {"name": "Drawer Sides", "qty": "drawers*2", "length": "drawer_side", "width": "drawer_h - 2*T_ALL",
+         "when": "drawers > 0"},
+        {"name": "Drawer Back", "qty": "drawers", "length": "shelf_len - 5*T_ALL", "width": "drawer_h - 2*T_ALL",
+         "when": "drawers > 0"},
+        {"name": "Drawer Front", "qty": "drawers", "length": "shelf_len - 5*T_ALL",
+         "width": "(drawer_h - 2*T_ALL)/2", "when": "drawers > 0"},
+        {"name": "Drawer Bottoms - (6mm)", "qty": "drawers", "length": "shelf_len - 3*T_ALL",
+         "width": "depth - 2*T_ALL", "when": "drawers > 0", "thickness": "6", "finish": "plain"},
+        {"name": "Side Extra Pieces", "qty": "drawers*3", "length": "drawer_side", "width": "drawer_h - T_ALL",
+         "when": "drawers > 0"},
+        {"name": "Front Extra Pieces", "qty": "drawers", "length": "shelf_len - 1*T_ALL",
+         "width": "drawer_h - T_ALL", "when": "drawers > 0"},
+        {"name": "Front Extra Pieces on Down", "qty": "1", "length": "length - 2*T_ALL + 2", "width": "plinth"},
+    ],
+}
+
+form_type2 = make_form(SPEC)
+calc_type2 = make_calc(SPEC)